@@ -0,0 +1,125 @@
+/*
+  mmgen = Multi-Mode GENerator, command-line Bitcoin cold storage solution
+  Copyright (C)2013-2017 Philemon <mmgen-py@yandex.com>
+
+  This program is free software: you can redistribute it and/or modify it under
+  the terms of the GNU General Public License as published by the Free Software
+  Foundation, either version 3 of the License, or (at your option) any later
+  version.
+
+  This program is distributed in the hope that it will be useful, but WITHOUT
+  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+  FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+  details.
+
+  You should have received a copy of the GNU General Public License along with
+  this program.  If not, see <http://www.gnu.org/licenses/>.
+*/
+
+/* Base 58 conversion of big-endian unsigned numbers.  Leading zero bytes and
+   leading zero digits ('1') carry no value and are dropped, as in the Python
+   implementation in protocol.py, so encode() and decode() never emit them. */
+
+#include <Python.h>
+
+static const char b58a[] = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz";
+
+static const signed char b58d[256] = {
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1, 0, 1, 2, 3, 4, 5, 6, 7, 8,-1,-1,-1,-1,-1,-1,
+	-1, 9,10,11,12,13,14,15,16,-1,17,18,19,20,21,-1,
+	22,23,24,25,26,27,28,29,30,31,32,-1,-1,-1,-1,-1,
+	-1,33,34,35,36,37,38,39,40,41,42,43,-1,44,45,46,
+	47,48,49,50,51,52,53,54,55,56,57,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+	-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,-1,
+};
+
+/* Takes a byte string, returns its numeric value as a base 58 string */
+static PyObject * encode(PyObject *self, PyObject *args) {
+	const unsigned char * data;
+	int dlen;
+	if (!PyArg_ParseTuple(args, "s#", &data, &dlen))
+		return NULL;
+	while (dlen && *data == 0) { data++; dlen--; }
+	/* log(256)/log(58) = 1.366 */
+	size_t size = dlen * 138 / 100 + 1, len = 0, i;
+	unsigned char * b58 = PyMem_Malloc(size);
+	if (b58 == NULL) return PyErr_NoMemory();
+	for (; dlen; data++, dlen--) {
+		unsigned int carry = *data;
+		for (i = 0; i < len; i++) {
+			carry += (unsigned int)b58[i] << 8;
+			b58[i] = carry % 58;
+			carry /= 58;
+		}
+		while (carry) {
+			b58[len++] = carry % 58;
+			carry /= 58;
+		}
+	}
+	PyObject * ret = PyString_FromStringAndSize(NULL, len);
+	if (ret != NULL) {
+		char * out = PyString_AS_STRING(ret);
+		for (i = 0; i < len; i++) out[i] = b58a[b58[len-1-i]];
+	}
+	PyMem_Free(b58);
+	return ret;
+}
+
+/* Takes a base 58 string, returns its numeric value as a byte string */
+static PyObject * decode(PyObject *self, PyObject *args) {
+	const unsigned char * s;
+	int slen;
+	if (!PyArg_ParseTuple(args, "s#", &s, &slen))
+		return NULL;
+	/* log(58)/log(256) = 0.732 */
+	size_t size = slen * 733 / 1000 + 1, len = 0, i;
+	unsigned char * b256 = PyMem_Malloc(size);
+	if (b256 == NULL) return PyErr_NoMemory();
+	for (; slen; s++, slen--) {
+		int d = b58d[*s];
+		if (d == -1) {
+			PyMem_Free(b256);
+			PyErr_SetString(PyExc_ValueError, "invalid b58 value");
+			return NULL;
+		}
+		unsigned int carry = d;
+		for (i = 0; i < len; i++) {
+			carry += (unsigned int)b256[i] * 58;
+			b256[i] = carry & 0xff;
+			carry >>= 8;
+		}
+		while (carry) {
+			b256[len++] = carry & 0xff;
+			carry >>= 8;
+		}
+	}
+	PyObject * ret = PyString_FromStringAndSize(NULL, len);
+	if (ret != NULL) {
+		char * out = PyString_AS_STRING(ret);
+		for (i = 0; i < len; i++) out[i] = b256[len-1-i];
+	}
+	PyMem_Free(b256);
+	return ret;
+}
+
+static PyMethodDef b58Methods[] = {
+	{"encode", encode, METH_VARARGS, "Encode a byte string as a base 58 number"},
+	{"decode", decode, METH_VARARGS, "Decode a base 58 number to a byte string"},
+	{NULL, NULL, 0, NULL} /* Sentinel */
+};
+
+PyMODINIT_FUNC initb58(void) {
+	PyObject *m;
+	m = Py_InitModule("b58", b58Methods);
+	if (m == NULL) return;
+}
@@ -0,0 +1,139 @@
+/*
+  mmgen = Multi-Mode GENerator, command-line Bitcoin cold storage solution
+  Copyright (C)2013-2017 Philemon <mmgen-py@yandex.com>
+
+  This program is free software: you can redistribute it and/or modify it under
+  the terms of the GNU General Public License as published by the Free Software
+  Foundation, either version 3 of the License, or (at your option) any later
+  version.
+
+  This program is distributed in the hope that it will be useful, but WITHOUT
+  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+  FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+  details.
+
+  You should have received a copy of the GNU General Public License along with
+  this program.  If not, see <http://www.gnu.org/licenses/>.
+*/
+
+/* The scrypt ROMix function (SMix), applied to a single 128*r-byte block.  See
+   RFC 7914.  The GIL is released during the computation, so independent blocks
+   (the 'p' lanes of scrypt) may be processed in parallel by Python threads. */
+
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#define R(a,b) (((a) << (b)) | ((a) >> (32 - (b))))
+
+static void salsa20_8(uint32_t B[16]) {
+	uint32_t x[16];
+	int i;
+	memcpy(x, B, 64);
+	for (i = 0; i < 8; i += 2) {
+		x[ 4] ^= R(x[ 0]+x[12], 7);  x[ 8] ^= R(x[ 4]+x[ 0], 9);
+		x[12] ^= R(x[ 8]+x[ 4],13);  x[ 0] ^= R(x[12]+x[ 8],18);
+		x[ 9] ^= R(x[ 5]+x[ 1], 7);  x[13] ^= R(x[ 9]+x[ 5], 9);
+		x[ 1] ^= R(x[13]+x[ 9],13);  x[ 5] ^= R(x[ 1]+x[13],18);
+		x[14] ^= R(x[10]+x[ 6], 7);  x[ 2] ^= R(x[14]+x[10], 9);
+		x[ 6] ^= R(x[ 2]+x[14],13);  x[10] ^= R(x[ 6]+x[ 2],18);
+		x[ 3] ^= R(x[15]+x[11], 7);  x[ 7] ^= R(x[ 3]+x[15], 9);
+		x[11] ^= R(x[ 7]+x[ 3],13);  x[15] ^= R(x[11]+x[ 7],18);
+		x[ 1] ^= R(x[ 0]+x[ 3], 7);  x[ 2] ^= R(x[ 1]+x[ 0], 9);
+		x[ 3] ^= R(x[ 2]+x[ 1],13);  x[ 0] ^= R(x[ 3]+x[ 2],18);
+		x[ 6] ^= R(x[ 5]+x[ 4], 7);  x[ 7] ^= R(x[ 6]+x[ 5], 9);
+		x[ 4] ^= R(x[ 7]+x[ 6],13);  x[ 5] ^= R(x[ 4]+x[ 7],18);
+		x[11] ^= R(x[10]+x[ 9], 7);  x[ 8] ^= R(x[11]+x[10], 9);
+		x[ 9] ^= R(x[ 8]+x[11],13);  x[10] ^= R(x[ 9]+x[ 8],18);
+		x[12] ^= R(x[15]+x[14], 7);  x[13] ^= R(x[12]+x[15], 9);
+		x[14] ^= R(x[13]+x[12],13);  x[15] ^= R(x[14]+x[13],18);
+	}
+	for (i = 0; i < 16; i++) B[i] += x[i];
+}
+
+/* B: 2*r 64-byte blocks, Y: scratch space of the same size */
+static void blockmix_salsa8(uint32_t * B, uint32_t * Y, size_t r) {
+	uint32_t X[16];
+	size_t i, j;
+	memcpy(X, &B[(2*r-1)*16], 64);
+	for (i = 0; i < 2*r; i++) {
+		for (j = 0; j < 16; j++) X[j] ^= B[i*16+j];
+		salsa20_8(X);
+		memcpy(&Y[i*16], X, 64);
+	}
+	/* even blocks go to the first half of B, odd blocks to the second */
+	for (i = 0; i < r; i++) {
+		memcpy(&B[i*16],     &Y[(2*i)*16],   64);
+		memcpy(&B[(i+r)*16], &Y[(2*i+1)*16], 64);
+	}
+}
+
+static void smix(unsigned char * data, size_t r, uint64_t N, uint32_t * X, uint32_t * Y, uint32_t * V) {
+	size_t words = 32 * r, k;
+	uint64_t i, j;
+	for (k = 0; k < words; k++)
+		X[k] = (uint32_t)data[k*4] | (uint32_t)data[k*4+1] << 8 |
+				(uint32_t)data[k*4+2] << 16 | (uint32_t)data[k*4+3] << 24;
+	for (i = 0; i < N; i++) {
+		memcpy(&V[i*words], X, words * 4);
+		blockmix_salsa8(X, Y, r);
+	}
+	for (i = 0; i < N; i++) {
+		j = X[(2*r-1)*16] & (N - 1); /* Integerify */
+		for (k = 0; k < words; k++) X[k] ^= V[j*words+k];
+		blockmix_salsa8(X, Y, r);
+	}
+	for (k = 0; k < words; k++) {
+		data[k*4]   = X[k];
+		data[k*4+1] = X[k] >> 8;
+		data[k*4+2] = X[k] >> 16;
+		data[k*4+3] = X[k] >> 24;
+	}
+}
+
+/* Takes a 128*r-byte string and the cost parameter N, returns ROMix(data,N) */
+static PyObject * romix(PyObject *self, PyObject *args) {
+	const char * data;
+	int dlen;
+	unsigned long long N;
+	if (!PyArg_ParseTuple(args, "s#K", &data, &dlen, &N))
+		return NULL;
+	if (dlen == 0 || dlen % 128) {
+		PyErr_SetString(PyExc_ValueError, "Data length not a non-zero multiple of 128 bytes");
+		return NULL;
+	}
+	if (N < 2 || (N & (N - 1))) {
+		PyErr_SetString(PyExc_ValueError, "N must be a power of two greater than one");
+		return NULL;
+	}
+	size_t r = dlen / 128;
+	if (N > SIZE_MAX / 128 / r) return PyErr_NoMemory();
+	uint32_t * XY = PyMem_Malloc(256 * r);
+	uint32_t * V = PyMem_Malloc(128 * r * N);
+	if (XY == NULL || V == NULL) {
+		PyMem_Free(XY);
+		PyMem_Free(V);
+		return PyErr_NoMemory();
+	}
+	PyObject * ret = PyString_FromStringAndSize(data, dlen);
+	if (ret != NULL) {
+		unsigned char * out = (unsigned char *)PyString_AS_STRING(ret);
+		Py_BEGIN_ALLOW_THREADS
+		smix(out, r, N, XY, XY + 32 * r, V);
+		Py_END_ALLOW_THREADS
+	}
+	PyMem_Free(XY);
+	PyMem_Free(V);
+	return ret;
+}
+
+static PyMethodDef scryptromixMethods[] = {
+	{"romix", romix, METH_VARARGS, "scrypt ROMix function for a single block"},
+	{NULL, NULL, 0, NULL} /* Sentinel */
+};
+
+PyMODINIT_FUNC initscryptromix(void) {
+	PyObject *m;
+	m = Py_InitModule("scryptromix", scryptromixMethods);
+	if (m == NULL) return;
+}
@@ -19,6 +19,15 @@
 #include <Python.h>
 #include <secp256k1.h>
 
+static secp256k1_context * get_ctx(void) {
+	static secp256k1_context *ctx = NULL;
+	if (ctx == NULL) {
+	/*	puts ("Initializing context"); */
+		ctx = secp256k1_context_create(SECP256K1_CONTEXT_SIGN | SECP256K1_CONTEXT_VERIFY);
+	}
+	return ctx;
+}
+
 static PyObject * priv2pub(PyObject *self, PyObject *args) {
 	const unsigned char * privkey;
 	const int klen;
@@ -32,11 +41,7 @@ static PyObject * priv2pub(PyObject *self, PyObject *args) {
 	secp256k1_pubkey pubkey;
 	size_t pubkeyclen = compressed == 1 ? 33: 65;
 	unsigned char pubkeyc[pubkeyclen];
-	static secp256k1_context *ctx = NULL;
-	if (ctx == NULL) {
-	/*	puts ("Initializing context"); */
-		ctx = secp256k1_context_create(SECP256K1_CONTEXT_SIGN | SECP256K1_CONTEXT_VERIFY);
-	}
+	secp256k1_context *ctx = get_ctx();
 	if (secp256k1_ec_pubkey_create(ctx, &pubkey, privkey) != 1) {
 		PyErr_SetString(PyExc_RuntimeError, "Public key creation failed");
 		return NULL;
@@ -49,8 +54,53 @@ static PyObject * priv2pub(PyObject *self, PyObject *args) {
 	return Py_BuildValue("s#", pubkeyc,pubkeyclen);
 }
 
+/* Takes a buffer of N concatenated 32-byte privkeys, returns a buffer of N
+   concatenated serialized pubkeys.  The GIL is released during generation. */
+static PyObject * priv2pub_batch(PyObject *self, PyObject *args) {
+	const unsigned char * privkeys;
+	const int klen;
+	const int compressed;
+	if (!PyArg_ParseTuple(args, "t#I", &privkeys, &klen, &compressed))
+		return NULL;
+	if (klen % 32) {
+		PyErr_SetString(PyExc_ValueError, "Private key buffer length not a multiple of 32 bytes");
+		return NULL;
+	}
+	int nkeys = klen / 32;
+	size_t pklen = compressed == 1 ? 33: 65;
+	PyObject *ret = PyString_FromStringAndSize(NULL, nkeys * pklen);
+	if (ret == NULL) return NULL;
+	unsigned char *out = (unsigned char *) PyString_AS_STRING(ret);
+	secp256k1_context *ctx = get_ctx();
+	int i, failed = -1, serialize_failed = 0;
+	Py_BEGIN_ALLOW_THREADS
+	for (i = 0; i < nkeys; i++) {
+		secp256k1_pubkey pubkey;
+		size_t outlen = pklen;
+		if (secp256k1_ec_pubkey_create(ctx, &pubkey, privkeys + i*32) != 1) {
+			failed = i;
+			break;
+		}
+		if (secp256k1_ec_pubkey_serialize(ctx, out + i*pklen, &outlen, &pubkey,
+				compressed == 1 ? SECP256K1_EC_COMPRESSED: SECP256K1_EC_UNCOMPRESSED) != 1) {
+			failed = i;
+			serialize_failed = 1;
+			break;
+		}
+	}
+	Py_END_ALLOW_THREADS
+	if (failed != -1) {
+		Py_DECREF(ret);
+		PyErr_Format(PyExc_RuntimeError, "Public key %s failed for key #%i",
+			serialize_failed ? "serialization" : "creation", failed);
+		return NULL;
+	}
+	return ret;
+}
+
 static PyMethodDef secp256k1Methods[] = {
 	{"priv2pub", priv2pub, METH_VARARGS, "Generate pubkey from privkey using libsecp256k1"},
+	{"priv2pub_batch", priv2pub_batch, METH_VARARGS, "Generate pubkeys from a buffer of privkeys using libsecp256k1"},
 	{NULL, NULL, 0, NULL} /* Sentinel */
 };
 
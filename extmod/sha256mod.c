@@ -0,0 +1,150 @@
+/*
+  mmgen = Multi-Mode GENerator, command-line Bitcoin cold storage solution
+  Copyright (C)2013-2017 Philemon <mmgen-py@yandex.com>
+
+  This program is free software: you can redistribute it and/or modify it under
+  the terms of the GNU General Public License as published by the Free Software
+  Foundation, either version 3 of the License, or (at your option) any later
+  version.
+
+  This program is distributed in the hope that it will be useful, but WITHOUT
+  ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+  FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+  details.
+
+  You should have received a copy of the GNU General Public License along with
+  this program.  If not, see <http://www.gnu.org/licenses/>.
+*/
+
+/* SHA256 compression function without message padding (Sha256Compress), as
+   used for Zcash z-addresses.  See FIPS 180-4. */
+
+#include <Python.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+static const uint32_t K[64] = {
+	0x428a2f98,0x71374491,0xb5c0fbcf,0xe9b5dba5,0x3956c25b,0x59f111f1,0x923f82a4,0xab1c5ed5,
+	0xd807aa98,0x12835b01,0x243185be,0x550c7dc3,0x72be5d74,0x80deb1fe,0x9bdc06a7,0xc19bf174,
+	0xe49b69c1,0xefbe4786,0x0fc19dc6,0x240ca1cc,0x2de92c6f,0x4a7484aa,0x5cb0a9dc,0x76f988da,
+	0x983e5152,0xa831c66d,0xb00327c8,0xbf597fc7,0xc6e00bf3,0xd5a79147,0x06ca6351,0x14292967,
+	0x27b70a85,0x2e1b2138,0x4d2c6dfc,0x53380d13,0x650a7354,0x766a0abb,0x81c2c92e,0x92722c85,
+	0xa2bfe8a1,0xa81a664b,0xc24b8b70,0xc76c51a3,0xd192e819,0xd6990624,0xf40e3585,0x106aa070,
+	0x19a4c116,0x1e376c08,0x2748774c,0x34b0bcb5,0x391c0cb3,0x4ed8aa4a,0x5b9cca4f,0x682e6ff3,
+	0x748f82ee,0x78a5636f,0x84c87814,0x8cc70208,0x90befffa,0xa4506ceb,0xbef9a3f7,0xc67178f2
+};
+
+#define ROTR(x,n) (((x) >> (n)) | ((x) << (32 - (n))))
+
+static void process_block(uint32_t * H, const unsigned char * blk) {
+	uint32_t W[64], a, b, c, d, e, f, g, h, t1, t2;
+	int i;
+	for (i = 0; i < 16; i++)
+		W[i] = (uint32_t)blk[i*4] << 24 | (uint32_t)blk[i*4+1] << 16 |
+				(uint32_t)blk[i*4+2] << 8 | (uint32_t)blk[i*4+3];
+	for (i = 16; i < 64; i++)
+		W[i] = (ROTR(W[i-2],17) ^ ROTR(W[i-2],19) ^ (W[i-2] >> 10)) + W[i-7] +
+				(ROTR(W[i-15],7) ^ ROTR(W[i-15],18) ^ (W[i-15] >> 3)) + W[i-16];
+	a = H[0]; b = H[1]; c = H[2]; d = H[3]; e = H[4]; f = H[5]; g = H[6]; h = H[7];
+	for (i = 0; i < 64; i++) {
+		t1 = h + (ROTR(e,6) ^ ROTR(e,11) ^ ROTR(e,25)) + ((e & f) ^ (~e & g)) + K[i] + W[i];
+		t2 = (ROTR(a,2) ^ ROTR(a,13) ^ ROTR(a,22)) + ((a & b) ^ (a & c) ^ (b & c));
+		h = g; g = f; f = e; e = d + t1; d = c; c = b; b = a; a = t1 + t2;
+	}
+	H[0] += a; H[1] += b; H[2] += c; H[3] += d; H[4] += e; H[5] += f; H[6] += g; H[7] += h;
+}
+
+/* Takes a string whose length is a multiple of 64 bytes, returns the 32-byte
+   hash state after processing it from the standard initial value. */
+static PyObject * compress(PyObject *self, PyObject *args) {
+	const unsigned char * data;
+	int dlen, i;
+	if (!PyArg_ParseTuple(args, "s#", &data, &dlen))
+		return NULL;
+	if (dlen % 64) {
+		PyErr_SetString(PyExc_ValueError, "Data length not a multiple of 64 bytes");
+		return NULL;
+	}
+	uint32_t H[8] = {
+		0x6a09e667,0xbb67ae85,0x3c6ef372,0xa54ff53a,0x510e527f,0x9b05688c,0x1f83d9ab,0x5be0cd19
+	};
+	for (i = 0; i < dlen; i += 64) process_block(H, data + i);
+	unsigned char out[32];
+	for (i = 0; i < 8; i++) {
+		out[i*4]   = H[i] >> 24;
+		out[i*4+1] = H[i] >> 16;
+		out[i*4+2] = H[i] >> 8;
+		out[i*4+3] = H[i];
+	}
+	return Py_BuildValue("s#", out, 32);
+}
+
+/* Takes a string 'data', a message length 'mlen' (less than 56) and a string
+   of concatenated 4-byte hash prefixes.  Returns the list of offsets in 'data'
+   at which an 'mlen'-byte substring has a SHA256 hash beginning with one of the
+   prefixes.  Used to search devices for hidden incognito wallet data.  The GIL
+   is released during the search. */
+static PyObject * scan(PyObject *self, PyObject *args) {
+	const unsigned char * data, * pfx;
+	int dlen, mlen, plen, i, j, nfound = 0, nalloc = 16;
+	if (!PyArg_ParseTuple(args, "s#is#", &data, &dlen, &mlen, &pfx, &plen))
+		return NULL;
+	if (mlen < 1 || mlen > 55 || plen % 4) {
+		PyErr_SetString(PyExc_ValueError, "Invalid message or prefix length");
+		return NULL;
+	}
+	int npfx = plen / 4;
+	uint32_t P[npfx ? npfx : 1];
+	for (j = 0; j < npfx; j++)
+		P[j] = (uint32_t)pfx[j*4] << 24 | (uint32_t)pfx[j*4+1] << 16 |
+				(uint32_t)pfx[j*4+2] << 8 | (uint32_t)pfx[j*4+3];
+	int * found = malloc(nalloc * sizeof(int));
+	if (found == NULL) return PyErr_NoMemory();
+	int nomem = 0;
+	Py_BEGIN_ALLOW_THREADS
+	unsigned char blk[64] = {0};
+	blk[mlen] = 0x80;
+	blk[62] = (mlen * 8) >> 8;
+	blk[63] = mlen * 8;
+	uint32_t H[8];
+	for (i = 0; i <= dlen - mlen; i++) {
+		memcpy(blk, data + i, mlen);
+		H[0] = 0x6a09e667; H[1] = 0xbb67ae85; H[2] = 0x3c6ef372; H[3] = 0xa54ff53a;
+		H[4] = 0x510e527f; H[5] = 0x9b05688c; H[6] = 0x1f83d9ab; H[7] = 0x5be0cd19;
+		process_block(H, blk);
+		for (j = 0; j < npfx; j++) {
+			if (H[0] != P[j]) continue;
+			if (nfound == nalloc) {
+				int * tmp = realloc(found, (nalloc *= 2) * sizeof(int));
+				if (tmp == NULL) { nomem = 1; break; }
+				found = tmp;
+			}
+			found[nfound++] = i;
+			break;
+		}
+		if (nomem) break;
+	}
+	Py_END_ALLOW_THREADS
+	if (nomem) {
+		free(found);
+		return PyErr_NoMemory();
+	}
+	PyObject * ret = PyList_New(nfound);
+	for (i = 0; ret != NULL && i < nfound; i++)
+		PyList_SET_ITEM(ret, i, PyInt_FromLong(found[i]));
+	free(found);
+	return ret;
+}
+
+static PyMethodDef sha256compressMethods[] = {
+	{"compress", compress, METH_VARARGS, "SHA256 compression of unpadded data"},
+	{"scan", scan, METH_VARARGS, "search data for substrings with the given SHA256 hash prefixes"},
+	{NULL, NULL, 0, NULL} /* Sentinel */
+};
+
+PyMODINIT_FUNC initsha256compress(void) {
+	PyObject *m;
+	m = Py_InitModule("sha256compress", sha256compressMethods);
+	if (m == NULL) return;
+}
@@ -22,6 +22,7 @@ addr.py:  Address generation/display routines for the MMGen suite
 
 from hashlib import sha256,sha512
 from binascii import hexlify,unhexlify
+from collections import namedtuple
 from mmgen.common import *
 from mmgen.obj import *
 
@@ -52,11 +53,22 @@ class AddrGenerator(MMGenObject):
 		me.desc = gen_methods
 		return me
 
+	def pubbin2addr_batch(self,pubkeys):
+		return [self.pubbin2addr(pb) for pb in pubkeys]
+
+	# return (addr,viewkey) pairs; overridden by generators that can share work between the two
+	def pubbin2addr_viewkey_batch(self,pubkeys,gen_viewkey):
+		addrs = self.pubbin2addr_batch(pubkeys)
+		return zip(addrs,[self.to_viewkey(hexlify(pb)) for pb in pubkeys] if gen_viewkey else [None]*len(addrs))
+
 class AddrGeneratorP2PKH(AddrGenerator):
 	def to_addr(self,pubhex):
-		from mmgen.protocol import hash160
 		assert type(pubhex) == PubKey
-		return CoinAddr(g.proto.pubhash2addr(hash160(pubhex),p2sh=False))
+		return self.pubbin2addr(unhexlify(pubhex))
+
+	def pubbin2addr(self,pubkey):
+		from mmgen.protocol import hash160_bin
+		return CoinAddr(g.proto.pubhash2addr_bin(hash160_bin(pubkey),p2sh=False))
 
 	def to_segwit_redeem_script(self,pubhex):
 		raise NotImplementedError,'Coin/type pair incompatible with Segwit'
@@ -64,7 +76,11 @@ class AddrGeneratorP2PKH(AddrGenerator):
 class AddrGeneratorSegwit(AddrGenerator):
 	def to_addr(self,pubhex):
 		assert pubhex.compressed,'Uncompressed public keys incompatible with Segwit'
-		return CoinAddr(g.proto.pubhex2segwitaddr(pubhex))
+		return self.pubbin2addr(unhexlify(pubhex))
+
+	def pubbin2addr(self,pubkey):
+		assert len(pubkey) == 33,'Uncompressed public keys incompatible with Segwit'
+		return CoinAddr(g.proto.pubbin2segwitaddr(pubkey))
 
 	def to_segwit_redeem_script(self,pubhex):
 		assert pubhex.compressed,'Uncompressed public keys incompatible with Segwit'
@@ -73,8 +89,11 @@ class AddrGeneratorSegwit(AddrGenerator):
 class AddrGeneratorEthereum(AddrGenerator):
 	def to_addr(self,pubhex):
 		assert type(pubhex) == PubKey
+		return self.pubbin2addr(unhexlify(pubhex))
+
+	def pubbin2addr(self,pubkey):
 		import sha3
-		return CoinAddr(sha3.keccak_256(pubhex[2:].decode('hex')).digest()[12:].encode('hex'))
+		return CoinAddr(hexlify(sha3.keccak_256(pubkey[1:]).digest()[12:]))
 
 	def to_segwit_redeem_script(self,pubhex):
 		raise NotImplementedError,'Coin/type pair incompatible with Segwit'
@@ -83,33 +102,40 @@ class AddrGeneratorEthereum(AddrGenerator):
 class AddrGeneratorZcashZ(AddrGenerator):
 
 	def zhash256(self,s,t):
-		s = map(ord,s+'\0'*32)
-		s[0] |= 0xc0
-		s[32] = t
 		from mmgen.sha256 import Sha256
-		return Sha256(map(chr,s),preprocess=False).digest()
+		return Sha256(chr(ord(s[0]) | 0xc0) + s[1:] + chr(t) + '\0'*31,preprocess=False).digest()
 
 	def to_addr(self,pubhex): # pubhex is really privhex
-		key = pubhex.decode('hex')
-		assert len(key) == 32,'{}: incorrect privkey length'.format(len(key))
-		from nacl.bindings import crypto_scalarmult_base
-		p2 = crypto_scalarmult_base(self.zhash256(key,1))
-		from mmgen.protocol import _b58chk_encode
-		ret = _b58chk_encode(g.proto.addr_ver_num['zcash_z'][0] + hexlify(self.zhash256(key,0)+p2))
-		assert len(ret) == g.proto.addr_width,'Invalid Zcash z-address length'
-		return CoinAddr(ret)
+		return self.pubbin2addr(unhexlify(pubhex))
+
+	def pubbin2addr(self,key): # key is really the privkey
+		return self.pubbin2addr_viewkey_batch([key],gen_viewkey=False)[0][0]
 
 	def to_viewkey(self,pubhex): # pubhex is really privhex
-		key = pubhex.decode('hex')
-		assert len(key) == 32,'{}: incorrect privkey length'.format(len(key))
-		vk = map(ord,self.zhash256(key,0)+self.zhash256(key,1))
-		vk[32] &= 0xf8
-		vk[63] &= 0x7f
-		vk[63] |= 0x40
-		from mmgen.protocol import _b58chk_encode
-		ret = _b58chk_encode(g.proto.addr_ver_num['viewkey'][0] + hexlify(''.join(map(chr,vk))))
-		assert len(ret) == g.proto.addr_width,'Invalid Zcash view key length'
-		return ZcashViewKey(ret)
+		return self.pubbin2addr_viewkey_batch([pubhex.decode('hex')],gen_viewkey=True)[0][1]
+
+	# address and viewkey share the hashes zhash256(key,0) and zhash256(key,1)
+	def pubbin2addr_viewkey_batch(self,keys,gen_viewkey):
+		from nacl.bindings import crypto_scalarmult_base
+		from mmgen.protocol import _b58chk_encode_bin
+		addr_ver = unhexlify(g.proto.addr_ver_num['zcash_z'][0])
+		vk_ver = unhexlify(g.proto.addr_ver_num['viewkey'][0])
+		ret = []
+		for key in keys:
+			assert len(key) == 32,'{}: incorrect privkey length'.format(len(key))
+			h0,h1 = self.zhash256(key,0),self.zhash256(key,1)
+			addr = _b58chk_encode_bin(addr_ver + h0 + crypto_scalarmult_base(h1))
+			assert len(addr) == g.proto.addr_width,'Invalid Zcash z-address length'
+			vk = None
+			if gen_viewkey:
+				vk = h0 + chr(ord(h1[0]) & 0xf8) + h1[1:31] + chr(ord(h1[31]) & 0x7f | 0x40)
+				vk = _b58chk_encode_bin(vk_ver + vk)
+				assert len(vk) == g.proto.addr_width,'Invalid Zcash view key length'
+			ret.append((CoinAddr(addr),vk and ZcashViewKey(vk)))
+		return ret
+
+	def pubbin2addr_batch(self,keys):
+		return [a for a,vk in self.pubbin2addr_viewkey_batch(keys,gen_viewkey=False)]
 
 	def to_segwit_redeem_script(self,pubhex):
 		raise NotImplementedError,'Zcash z-addresses incompatible with Segwit'
@@ -123,6 +149,35 @@ class AddrGeneratorMonero(AddrGenerator):
 		return a + b
 
 	def to_addr(self,sk_hex): # sk_hex instead of pubhex
+		return self.pubbin2addr(unhexlify(sk_hex))
+
+	# scalar and encoded point from the reference code, for testing other implementations
+	scalarmultbase_kat = (
+		'70d8664ae46bed1ce20ed8002018073cc0d0d4fa9306c78f6f30fa1b1dd39e03',
+		'5097552be888e401728a962c068b5a9bad0826c9af95f562cbf80873e70d040a' )
+	scalarmultbase_fn = None
+
+	@classmethod
+	def get_scalarmultbase(cls):
+		"""
+		Return a function mapping a 32-byte little-endian scalar to the encoded ed25519
+		point scalar*B.  libsodium is used if available and it passes the known-answer
+		test; otherwise the (very slow) reference code is the fallback
+		"""
+		if not cls.scalarmultbase_fn:
+			try:
+				from nacl.bindings import crypto_scalarmult_ed25519_base_noclamp as f
+				assert f(unhexlify(cls.scalarmultbase_kat[0])) == unhexlify(cls.scalarmultbase_kat[1])
+				def scalarmultbase(s):
+					try: return f(s)
+					except RuntimeError: return cls.scalarmultbase_ref(s) # zero scalar
+			except:
+				scalarmultbase = cls.scalarmultbase_ref
+			cls.scalarmultbase_fn = staticmethod(scalarmultbase)
+		return cls.scalarmultbase_fn
+
+	@staticmethod
+	def scalarmultbase_ref(s):
 
 		# ed25519ll, a low-level ctypes wrapper for Ed25519 digital signatures by
 		# Daniel Holth <dholth@fastmail.fm> - http://bitbucket.org/dholth/ed25519ll/
@@ -142,16 +197,25 @@ class AddrGeneratorMonero(AddrGenerator):
 			if e & 1: Q = edwards(Q, B)
 			return Q
 
-		def hex2int_le(hexstr):
-			return int(hexstr.decode('hex')[::-1].encode('hex'),16)
+		return encodepoint(scalarmultbase(int(hexlify(s[::-1]),16)))
+
+	def pubbin2addr(self,sk): # sk instead of pubkey
+		return self.pubbin2addr_batch([sk])[0]
 
-		vk_hex = self.to_viewkey(sk_hex)
-		pk_str  = encodepoint(scalarmultbase(hex2int_le(sk_hex)))
-		pvk_str = encodepoint(scalarmultbase(hex2int_le(vk_hex)))
-		addr_p1 = g.proto.addr_ver_num['monero'][0].decode('hex') + pk_str + pvk_str
+	def pubbin2addr_batch(self,sks):
+		return [a for a,vk in self.pubbin2addr_viewkey_batch(sks,gen_viewkey=False)]
 
+	def pubbin2addr_viewkey_batch(self,sks,gen_viewkey):
 		import sha3
-		return CoinAddr(self.b58enc(addr_p1 + sha3.keccak_256(addr_p1).digest()[:4]))
+		smb = self.get_scalarmultbase()
+		ver_num = unhexlify(g.proto.addr_ver_num['monero'][0])
+		ret = []
+		for sk in sks:
+			vk = self.to_viewkey(hexlify(sk))
+			addr_p1 = ver_num + smb(sk) + smb(unhexlify(vk))
+			addr = CoinAddr(self.b58enc(addr_p1 + sha3.keccak_256(addr_p1).digest()[:4]))
+			ret.append((addr,vk if gen_viewkey else None))
+		return ret
 
 	def to_wallet_passwd(self,sk_hex):
 		from mmgen.protocol import hash256
@@ -179,9 +243,9 @@ class KeyGenerator(MMGenObject):
 			if cls.test_for_secp256k1(silent=silent) and generator != 1:
 				if not opt.key_generator or opt.key_generator == 2 or generator == 2:
 					return super(cls,cls).__new__(KeyGeneratorSecp256k1)
-			else:
-				msg('Using (slow) native Python ECDSA library for address generation')
-				return super(cls,cls).__new__(KeyGeneratorPython)
+			if not silent:
+				msg('Using native Python secp256k1 library for address generation')
+			return super(cls,cls).__new__(KeyGeneratorPython)
 		elif pubkey_type in ('zcash_z','monero'):
 			g.proto.addr_width = 95
 			me = super(cls,cls).__new__(KeyGeneratorDummy)
@@ -190,6 +254,18 @@ class KeyGenerator(MMGenObject):
 		else:
 			raise ValueError,'{}: invalid pubkey_type argument'.format(pubkey_type)
 
+	# Pubkeys are generated in binary form; to_pubhex() and to_pubhex_batch() are
+	# for callers that need a PubKey object
+	def to_pubhex(self,privhex):
+		return PubKey(hexlify(self.to_pubbin(privhex)),compressed=privhex.compressed)
+
+	def to_pubhex_batch(self,privkeys):
+		return [PubKey(hexlify(pb),compressed=k.compressed)
+					for k,pb in zip(privkeys,self.to_pubbin_batch(privkeys))]
+
+	def to_pubbin_batch(self,privkeys):
+		return [self.to_pubbin(k) for k in privkeys]
+
 	@classmethod
 	def test_for_secp256k1(self,silent=False):
 		try:
@@ -199,54 +275,114 @@ class KeyGenerator(MMGenObject):
 		except:
 			return False
 
-import ecdsa
 class KeyGeneratorPython(KeyGenerator):
-	desc = 'mmgen-python-ecdsa'
-	# From electrum:
-	# secp256k1, http://www.oid-info.com/get/1.3.132.0.10
-	_p = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2FL
-	_r = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141L
-	_b = 0x0000000000000000000000000000000000000000000000000000000000000007L
-	_a = 0x0000000000000000000000000000000000000000000000000000000000000000L
-	_Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798L
-	_Gy = 0x483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb10d4b8L
-	_curve_secp256k1 = ecdsa.ellipticcurve.CurveFp(_p,_a,_b)
-	_generator_secp256k1 = ecdsa.ellipticcurve.Point(_curve_secp256k1,_Gx,_Gy,_r)
-	_oid_secp256k1 = (1,3,132,0,10)
-	_secp256k1 = ecdsa.curves.Curve('secp256k1',_curve_secp256k1,_generator_secp256k1,_oid_secp256k1)
-
-	# devdoc/guide_wallets.md:
-	# Uncompressed public keys start with 0x04; compressed public keys begin with
-	# 0x03 or 0x02 depending on whether they're greater or less than the midpoint
-	# of the curve.
-	def privnum2pubhex(self,numpriv,compressed=False):
-		pko = ecdsa.SigningKey.from_secret_exponent(numpriv,self._secp256k1)
-		# pubkey = 32-byte X coord + 32-byte Y coord (unsigned big-endian)
-		pubkey = hexlify(pko.get_verifying_key().to_string())
-		if compressed: # discard Y coord, replace with appropriate version byte
-			# even Y: <0, odd Y: >0 -- https://bitcointalk.org/index.php?topic=129652.0
-			p = ('03','02')[pubkey[-1] in '02468ace']
-			return p+pubkey[:64]
-		else:
-			return '04'+pubkey
+	desc = 'mmgen-python-native'
 
-	def to_pubhex(self,privhex):
+	def privnum2pubbin(self,numpriv,compressed=False):
+		from mmgen.secp256k1_native import privnums2points,serialize_point
+		return serialize_point(privnums2points([numpriv])[0],compressed)
+
+	def to_pubbin(self,privhex):
 		assert type(privhex) == PrivKey
-		return PubKey(self.privnum2pubhex(
-			int(privhex,16),compressed=privhex.compressed),compressed=privhex.compressed)
+		return self.privnum2pubbin(int(privhex,16),compressed=privhex.compressed)
+
+	# one field inversion for the whole batch
+	def to_pubbin_batch(self,privkeys):
+		from mmgen.secp256k1_native import privnums2points,serialize_point
+		for k in privkeys: assert type(k) == PrivKey
+		pts = privnums2points([int(k,16) for k in privkeys])
+		return [serialize_point(pt,k.compressed) for k,pt in zip(privkeys,pts)]
 
 class KeyGeneratorSecp256k1(KeyGenerator):
 	desc = 'mmgen-secp256k1'
-	def to_pubhex(self,privhex):
+	def to_pubbin(self,privhex):
 		assert type(privhex) == PrivKey
 		from mmgen.secp256k1 import priv2pub
-		return PubKey(hexlify(priv2pub(unhexlify(privhex),int(privhex.compressed))),compressed=privhex.compressed)
+		return priv2pub(unhexlify(privhex),int(privhex.compressed))
+
+	batch_min = 8 # for fewer keys than this, the batch call isn't worth the overhead
+
+	def to_pubbin_batch(self,privkeys):
+		if len(privkeys) < self.batch_min:
+			return KeyGenerator.to_pubbin_batch(self,privkeys)
+		try: from mmgen.secp256k1 import priv2pub_batch
+		except ImportError: # extension module built without batch support
+			return KeyGenerator.to_pubbin_batch(self,privkeys)
+		ret = [None] * len(privkeys)
+		for compressed in (False,True): # keys from a flat keylist may be mixed
+			idxs = [i for i,k in enumerate(privkeys) if bool(k.compressed) == compressed]
+			if not idxs: continue
+			for i in idxs: assert type(privkeys[i]) == PrivKey
+			buf = priv2pub_batch(''.join([unhexlify(privkeys[i]) for i in idxs]),int(compressed))
+			n = (65,33)[compressed]
+			for j,i in enumerate(idxs):
+				ret[i] = buf[j*n:(j+1)*n]
+		return ret
 
 class KeyGeneratorDummy(KeyGenerator):
 	desc = 'mmgen-dummy'
-	def to_pubhex(self,privhex):
+	def to_pubbin(self,privhex):
 		assert type(privhex) == PrivKey
-		return PubKey(str(privhex),compressed=privhex.compressed)
+		return unhexlify(privhex)
+
+def _gen_addr_data(secrets,mmtype,gen_viewkey,gen_wallet_passwd,chunksize=1000):
+	"""
+	Generate address data from an iterable of (idx,secret) pairs, yielding lists of
+	(idx,privkey,addr,viewkey,wallet_passwd) tuples.  Pubkeys are generated in
+	batches of 'chunksize'.
+	"""
+	from itertools import islice
+	kg = KeyGenerator(mmtype,silent=True)
+	ag = AddrGenerator(mmtype)
+	secrets = iter(secrets)
+	while True:
+		chunk = list(islice(secrets,chunksize))
+		if not chunk: break
+		privs = [PrivKey(sec,compressed=mmtype.compressed,pubkey_type=mmtype.pubkey_type) for num,sec in chunk]
+		addrs = ag.pubbin2addr_viewkey_batch(kg.to_pubbin_batch(privs),gen_viewkey) # viewkey: zcash_z,monero
+		yield [(num,sk,addr,vk,
+					ag.to_wallet_passwd(sk) if gen_wallet_passwd else None) # monero
+				for (num,sec),sk,(addr,vk) in zip(chunk,privs,addrs)]
+
+# Worker process for AddrList.generate(): the parent walks the seed hash chain,
+# while the workers do the key->pubkey->address conversion.  Workers are forked
+# with their args and results are returned through a pipe in chunks.  A process
+# pool can't be used here, as the MMGen commands run with the import lock held.
+def _addrgen_worker(conn,secrets,mmtype,gen_viewkey,gen_wallet_passwd):
+	import signal
+	signal.signal(signal.SIGINT,signal.SIG_IGN) # let the parent handle Ctrl-C
+	for chunk in _gen_addr_data(secrets,mmtype,gen_viewkey,gen_wallet_passwd):
+		conn.send([tuple(str(a) if a else None for a in d[2:]) for d in chunk])
+	conn.close()
+
+def _gen_key_chk_data(entries,mmtype,chunksize=1000):
+	"""
+	Check that the keys of 'entries' match their addresses, yielding (n,bad) for
+	each chunk of 'n' entries checked.  'bad' is the index of the first mismatching
+	entry, if any, after which checking stops.
+	"""
+	from itertools import islice
+	kg = KeyGenerator(mmtype,silent=True)
+	ag = AddrGenerator(mmtype)
+	recs,i = _addrlist_records(entries),0
+	while True:
+		chunk = list(islice(recs,chunksize))
+		if not chunk: break
+		addrs = ag.pubbin2addr_batch(kg.to_pubbin_batch([e.sec for e in chunk]))
+		for j,(e,addr) in enumerate(zip(chunk,addrs)):
+			if addr != e.addr:
+				yield j,i+j
+				return
+		yield len(chunk),None
+		i += len(chunk)
+
+# Worker process for AddrList.check_keys(), run like _addrgen_worker()
+def _keychk_worker(conn,entries,mmtype):
+	import signal
+	signal.signal(signal.SIGINT,signal.SIG_IGN)
+	for d in _gen_key_chk_data(entries,mmtype):
+		conn.send(d)
+	conn.close()
 
 class AddrListEntry(MMGenListItem):
 	addr    = MMGenListItemAttr('addr','CoinAddr')
@@ -256,6 +392,167 @@ class AddrListEntry(MMGenListItem):
 	viewkey = MMGenListItemAttr('viewkey','ViewKey')
 	wallet_passwd  = MMGenListItemAttr('wallet_passwd','WalletPassword')
 
+class AddrListStoreEntry(AddrListEntry):
+	"read-only copy of an AddrListStore entry"
+	def __init__(self,**kwargs):
+		for k in kwargs:
+			if kwargs[k] != None:
+				object.__setattr__(self,k,kwargs[k]) # values are validated by the attr descriptors
+
+	def __setattr__(self,name,value):
+		m = "'{}': entries of compact address lists are read-only; assign modified entries to the list"
+		raise AttributeError(m.format(name))
+
+class AddrListStore(MMGenObject):
+	"""
+	Compact list of AddrListEntry objects for address lists with a single address
+	type.  Indexes and compression flags are stored in arrays, and addresses and raw
+	keys in contiguous buffers.  Entries are created on access and validated as they
+	are created, which makes iteration over entries slow: records() yields
+	lightweight read-only records without validation, for bulk operations like
+	formatting and searching.
+
+	Entries are read-only copies.  To modify an entry, create a new one and assign
+	it to the list: 'lst[n] = AddrListEntry(...)'
+	"""
+	Record = namedtuple('AddrListRecord',['idx','addr','sec','label','viewkey','wallet_passwd'])
+	extra_attrs = ('viewkey','wallet_passwd')
+
+	def __init__(self,mmtype):
+		from array import array
+		self.mmtype = mmtype
+		self.pubkey_type = None # set by first key added
+		self.idx = array('I')
+		self.addr_buf = bytearray()
+		self.addr_offs = array('I',[0])
+		self.sec_buf = bytearray()  # raw keys, or nothing if list has no keys
+		self.compressed = bytearray()
+		self.labels = {} # by idx: most entries have no label
+		self.extra = dict((k,[]) for k in self.extra_attrs if k in mmtype.extra_attrs)
+
+	def __len__(self): return len(self.idx)
+
+	def __iter__(self):
+		for i in range(len(self)): yield self[i]
+
+	def __getitem__(self,i):
+		if type(i) == slice:
+			return self.get_slice(*i.indices(len(self)))
+		if i < 0: i += len(self)
+		if not 0 <= i < len(self):
+			raise IndexError,'AddrListStore index out of range'
+		r = self.get_record(i)
+		return AddrListStoreEntry(**r._asdict()) # None values are skipped
+
+	def __setitem__(self,i,e):
+		if i < 0: i += len(self)
+		assert e.idx == self.idx[i],'entry index cannot be changed'
+		self.pop(i)
+		self.insert(i,e)
+
+	def get_record(self,i):
+		a = str(self.addr_buf[self.addr_offs[i]:self.addr_offs[i+1]])
+		sec = None
+		if self.sec_buf:
+			sec = PrivKey(str(self.sec_buf[i*32:i*32+32]),
+						compressed=bool(self.compressed[i]),pubkey_type=self.pubkey_type)
+		idx = self.idx[i]
+		extra = [self.extra[k][i] if k in self.extra else None for k in self.extra_attrs]
+		return self.Record(idx,a or None,sec,self.labels.get(idx),*extra)
+
+	def records(self):
+		for i in range(len(self)): yield self.get_record(i)
+
+	def addrs(self):
+		for i in range(len(self)): yield str(self.addr_buf[self.addr_offs[i]:self.addr_offs[i+1]])
+
+	def get_slice(self,start,stop,step):
+		assert step == 1,'extended slices not supported'
+		new = AddrListStore(self.mmtype)
+		for i in range(start,stop): new.append_record(self.get_record(i))
+		return new
+
+	def append(self,e):
+		self.append_record(self.Record(*[getattr(e,k) for k in self.Record._fields]))
+
+	def check_key(self,r,n):
+		"check the key of record 'r' before adding it to a list of 'n' entries"
+		if r.sec:
+			if not self.pubkey_type:
+				assert not n,'all entries in list must have keys'
+				self.pubkey_type = r.sec.pubkey_type
+			assert r.sec.pubkey_type == self.pubkey_type,'mixed key types in list'
+			# save the non-preprocessed key, if available; preprocessing is idempotent
+			return (r.sec.orig_hex or r.sec).decode('hex')
+		else:
+			assert not self.sec_buf,'all entries in list must have keys'
+
+	def append_record(self,r):
+		sec = self.check_key(r,len(self))
+		self.idx.append(r.idx)
+		self.addr_buf += r.addr or ''
+		self.addr_offs.append(len(self.addr_buf))
+		if sec:
+			self.sec_buf += sec
+			self.compressed.append(r.sec.compressed)
+		if r.label: self.labels[r.idx] = r.label
+		for k in self.extra: self.extra[k].append(str(getattr(r,k)) if getattr(r,k) else None)
+
+	def shift_addr_offs(self,start,n):
+		"add 'n' to the address offsets from position 'start' on"
+		from array import array
+		if n and start < len(self.addr_offs):
+			self.addr_offs[start:] = array('I',[o + n for o in self.addr_offs[start:]])
+
+	# insert() and pop() splice the arrays and buffers in place
+	def insert(self,i,e):
+		if i < 0: i = max(i + len(self),0)
+		if i >= len(self):
+			return self.append(e)
+		r = self.Record(*[getattr(e,k) for k in self.Record._fields])
+		sec = self.check_key(r,len(self))
+		self.idx.insert(i,r.idx)
+		a,o = r.addr or '',self.addr_offs[i]
+		self.addr_buf[o:o] = a
+		self.shift_addr_offs(i+1,len(a))
+		self.addr_offs.insert(i+1,o + len(a))
+		if sec:
+			self.sec_buf[i*32:i*32] = sec
+			self.compressed.insert(i,r.sec.compressed)
+		if r.label: self.labels[r.idx] = r.label
+		for k in self.extra: self.extra[k].insert(i,str(getattr(r,k)) if getattr(r,k) else None)
+
+	def pop(self,i=-1):
+		if i < 0: i += len(self)
+		e = self[i]
+		self.labels.pop(self.idx[i],None)
+		del self.idx[i]
+		a,b = self.addr_offs[i],self.addr_offs[i+1]
+		del self.addr_buf[a:b]
+		del self.addr_offs[i+1]
+		self.shift_addr_offs(i+1,a-b)
+		if self.sec_buf:
+			del self.sec_buf[i*32:i*32+32]
+			del self.compressed[i]
+			if not self.idx: self.pubkey_type = None
+		for k in self.extra: del self.extra[k][i]
+		return e
+
+	def truncate(self,n):
+		for idx in self.idx[n:]: self.labels.pop(idx,None)
+		del self.idx[n:]
+		del self.addr_buf[self.addr_offs[n]:]
+		del self.addr_offs[n+1:]
+		if self.sec_buf:
+			del self.sec_buf[n*32:]
+			del self.compressed[n:]
+			if n == 0: self.pubkey_type = None
+		for k in self.extra: del self.extra[k][n:]
+
+# iterate over lightweight records if available
+def _addrlist_records(data):
+	return data.records() if type(data) == AddrListStore else iter(data)
+
 class PasswordListEntry(MMGenListItem):
 	passwd = MMGenImmutableAttr('passwd',unicode,typeconv=False) # TODO: create Password type
 	idx    = MMGenImmutableAttr('idx','AddrIdx')
@@ -268,11 +565,11 @@ class AddrListChksum(str,Hilite):
 
 	def __new__(cls,addrlist):
 		ea = addrlist.al_id.mmtype.extra_attrs # add viewkey and passwd to the mix, if present
-		lines = [' '.join(
-					addrlist.chksum_rec_f(e) +
-					tuple(getattr(e,a) for a in ea if getattr(e,a))
-				) for e in addrlist.data]
-		return str.__new__(cls,make_chksum_N(' '.join(lines), nchars=16, sep=True))
+		def gen_recs(): # space-separated records, hashed as they're produced
+			for n,e in enumerate(_addrlist_records(addrlist.data)):
+				if n: yield ' '
+				yield ' '.join(addrlist.chksum_rec_f(e) + tuple(getattr(e,a) for a in ea if getattr(e,a)))
+		return str.__new__(cls,make_chksum_N_iter(gen_recs(),nchars=16,sep=True))
 
 class AddrListIDStr(unicode,Hilite):
 	color = 'green'
@@ -282,17 +579,7 @@ class AddrListIDStr(unicode,Hilite):
 		except:
 			s = '(no idxs)'
 		else:
-			idxs = [e.idx for e in addrlist.data]
-			prev = idxs[0]
-			ret = prev,
-			for i in idxs[1:]:
-				if i == prev + 1:
-					if i == idxs[-1]: ret += '-', i
-				else:
-					if prev != ret[-1]: ret += '-', prev
-					ret += ',', i
-				prev = i
-			s = ''.join([unicode(i) for i in ret])
+			s = unicode(AddrIdxList.fmt_ranges(AddrIdxList.make_ranges(addrlist.iter_idxs())))
 
 		if fmt_str:
 			ret = fmt_str.format(s)
@@ -304,6 +591,74 @@ class AddrListIDStr(unicode,Hilite):
 
 		return unicode.__new__(cls,ret)
 
+class AddrChainCheckpoints(MMGenObject):
+	"""
+	Encrypted on-disk cache of seed hash chain states, saved every 'interval'
+	rounds and keyed by Seed ID, coin and address type.  The keys are derived
+	from the (scrambled) seed, so the cache is useless without it.
+	File format: nonce (16 bytes) + AES-CTR encrypted records + HMAC-SHA256.
+	Each record is a 4-byte big-endian round number plus a 64-byte chain state.
+	"""
+	ext = 'mmcp'
+	nonce_len = 16
+	rec_fmt = '>I64s'
+	rec_len = 68
+
+	def __init__(self,al_id,seed,interval):
+		import hmac
+		self.interval = interval
+		self.dir = os.path.join(g.data_dir,'addr_checkpoints')
+		self.fn = os.path.join(self.dir,'{}-{}-{}.{}'.format(al_id.sid,g.coin,al_id.mmtype,self.ext))
+		self.key     = hmac.new(seed,'addr checkpoint encryption key',sha256).digest()
+		self.mac_key = hmac.new(seed,'addr checkpoint MAC key',sha256).digest()
+		self.data = {}
+		self.changed = False
+		self.load()
+
+	def make_mac(self,data):
+		import hmac
+		return hmac.new(self.mac_key,data,sha256).digest()
+
+	def load(self):
+		try:
+			with open(self.fn,'rb') as f: d = f.read()
+		except:
+			return
+		nl,rl = self.nonce_len,self.rec_len
+		if len(d) < nl + 32 or (len(d) - nl - 32) % rl or self.make_mac(d[:-32]) != d[-32:]:
+			msg("Warning: address checkpoint file '{}' is corrupted or invalid, ignoring".format(self.fn))
+			return
+		from mmgen.crypto import decrypt_data
+		from struct import unpack
+		dec = decrypt_data(d[nl:-32],self.key,iv=int(hexlify(d[:nl]),16),desc='address checkpoints')
+		self.data = dict(unpack(self.rec_fmt,dec[i:i+rl]) for i in range(0,len(dec),rl))
+		dmsg('Loaded {} address checkpoint{} from {}'.format(len(self.data),suf(self.data,'s'),self.fn))
+
+	def nearest(self,num):
+		"return the highest saved round not greater than 'num' and its chain state, or (0,None)"
+		rounds = [n for n in self.data if n <= num]
+		return (max(rounds),self.data[max(rounds)]) if rounds else (0,None)
+
+	def add(self,num,state):
+		if num % self.interval == 0 and num not in self.data:
+			self.data[num] = state
+			self.changed = True
+
+	def save(self):
+		if not self.changed: return
+		from mmgen.crypto import encrypt_data
+		from struct import pack
+		nonce = os.urandom(self.nonce_len) # needs only to be unique
+		plain = ''.join(pack(self.rec_fmt,n,self.data[n]) for n in sorted(self.data))
+		d = nonce + encrypt_data(plain,self.key,iv=int(hexlify(nonce),16),desc='address checkpoints',verify=False)
+		check_or_create_dir(self.dir)
+		tmp_fn = self.fn + '.tmp'
+		fd = os.open(tmp_fn,os.O_WRONLY|os.O_CREAT|os.O_TRUNC,0600)
+		with os.fdopen(fd,'wb') as f: f.write(d + self.make_mac(d))
+		os.rename(tmp_fn,self.fn)
+		self.changed = False
+		dmsg('Saved {} address checkpoint{} to {}'.format(len(self.data),suf(self.data,'s'),self.fn))
+
 class AddrList(MMGenObject): # Address info for a single seed ID
 	msgs = {
 	'file_header': """
@@ -335,12 +690,14 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 	has_keys = False
 	ext      = 'addrs'
 	scramble_hash_rounds = 10  # not too many rounds, so hand decoding can still be feasible
+	use_checkpoints = True
 	chksum_rec_f = lambda foo,e: (str(e.idx), e.addr)
 
 	def __init__(self,addrfile='',al_id='',adata=[],seed='',addr_idxs='',src='',
 					addrlist='',keylist='',mmtype=None,do_chksum=True,chksum_only=False):
 
 		self.update_msgs()
+		self.reset_indexes()
 		mmtype = mmtype or g.proto.dfl_mmtype
 		assert mmtype in MMGenAddrType.mmtypes,'{}: mmtype not in {}'.format(mmtype,repr(MMGenAddrType.mmtypes))
 
@@ -389,6 +746,50 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 		self.msgs = AddrList.msgs
 		self.msgs.update(type(self).msgs)
 
+	def gen_secrets(self,seed,addrnums):
+		"walk the seed hash chain, yielding (idx,secret) for each requested index"
+		cp = None
+		if g.addr_checkpoint_interval and self.use_checkpoints:
+			cp = AddrChainCheckpoints(self.al_id,seed,g.addr_checkpoint_interval)
+		num = 0
+		for idx in addrnums: # ascending
+			if cp and num + 1 < idx: # skip ahead to the nearest checkpoint, if any
+				n,state = cp.nearest(idx - 1)
+				if n > num: num,seed = n,state
+			while num != idx:
+				seed = sha512(seed).digest()
+				num += 1 # round
+				if cp: cp.add(num,seed)
+			# Secret key is double sha256 of seed hash round /num/
+			yield num,sha256(sha256(seed).digest()).digest()
+		if cp: cp.save()
+
+	def gen_addr_data_mp(self,secrets,jobs,gen_viewkey,gen_wallet_passwd):
+		"split secrets into contiguous slices, one per worker, yielding results in order"
+		import multiprocessing as mp
+		mmtype = self.al_id.mmtype
+		n = (len(secrets) + jobs - 1) / jobs
+		workers = []
+		for i in range(jobs):
+			r,w = mp.Pipe(duplex=False)
+			p = mp.Process(target=_addrgen_worker,
+					args=(w,secrets[i*n:(i+1)*n],mmtype,gen_viewkey,gen_wallet_passwd))
+			p.daemon = True
+			p.start()
+			w.close()
+			workers.append((p,r))
+		secrets = iter(secrets)
+		for p,r in workers:
+			while True:
+				try: chunk = r.recv()
+				except EOFError: break
+				for d in chunk: # addr data str values are converted by the entry attr descriptors
+					num,sec = secrets.next()
+					yield (num,PrivKey(sec,compressed=mmtype.compressed,pubkey_type=mmtype.pubkey_type)) + d
+			p.join()
+			if p.exitcode:
+				die(2,'Address generation worker process exited with error')
+
 	def generate(self,seed,addrnums):
 		assert type(addrnums) is AddrIdxList
 
@@ -402,36 +803,33 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 		gen_wallet_passwd = type(self) == KeyAddrList and 'wallet_passwd' in self.al_id.mmtype.extra_attrs
 		gen_viewkey       = type(self) == KeyAddrList and 'viewkey' in self.al_id.mmtype.extra_attrs
 
-		if self.gen_addrs:
-			kg = KeyGenerator(self.al_id.mmtype)
-			ag = AddrGenerator(self.al_id.mmtype)
-
-		t_addrs,num,pos,out = len(addrnums),0,0,AddrListList()
+		t_addrs,out = len(addrnums),self.new_data()
 		le = self.entry_type
+		secrets = self.gen_secrets(seed,addrnums)
 
-		while pos != t_addrs:
-			seed = sha512(seed).digest()
-			num += 1 # round
-
-			if num != addrnums[pos]: continue
+		# multiprocess mode relies on fork(), so is unavailable on Windows
+		jobs = min(opt.jobs or 1,t_addrs) if self.gen_addrs and g.platform == 'linux' else 1
+		if self.gen_addrs:
+			KeyGenerator(self.al_id.mmtype) # display any warnings only once
+		if jobs > 1:
+			data = self.gen_addr_data_mp(list(secrets),jobs,gen_viewkey,gen_wallet_passwd)
+		elif self.gen_addrs:
+			data = (d for chunk in _gen_addr_data(secrets,self.al_id.mmtype,gen_viewkey,gen_wallet_passwd)
+						for d in chunk)
+		else:
+			data = ((num,PrivKey(sec,compressed=compressed,pubkey_type=pubkey_type)) for num,sec in secrets)
 
-			pos += 1
+		for pos,d in enumerate(data,1):
+			num = d[0]
 
 			if not g.debug:
 				qmsg_r('\rGenerating %s #%s (%s of %s)' % (self.gen_desc,num,pos,t_addrs))
 
 			e = le(idx=num)
+			e.sec = d[1]
 
-			# Secret key is double sha256 of seed hash round /num/
-			e.sec = PrivKey(sha256(sha256(seed).digest()).digest(),compressed=compressed,pubkey_type=pubkey_type)
-
-			if self.gen_addrs:
-				ph = kg.to_pubhex(e.sec)
-				e.addr = ag.to_addr(ph)
-				if gen_viewkey:
-					e.viewkey = ag.to_viewkey(ph)
-				if gen_wallet_passwd:
-					e.wallet_passwd = ag.to_wallet_passwd(ph)
+			for k,v in zip(('addr','viewkey','wallet_passwd'),d[2:]):
+				if v: setattr(e,k,v)
 
 			if type(self) == PasswordList:
 				e.passwd = unicode(self.make_passwd(e.sec)) # TODO - own type
@@ -459,21 +857,40 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 		from mmgen.crypto import scramble_seed
 		return scramble_seed(seed,scramble_key,self.scramble_hash_rounds)
 
-	def encrypt(self,desc='new key list'):
-		from mmgen.crypto import mmgen_encrypt
-		self.fmt_data = mmgen_encrypt(self.fmt_data.encode('utf8'),desc,'')
+	# If format() hasn't been called, the formatted data is produced and written out
+	# chunk by chunk, so that large lists needn't be held in memory in formatted form
+	def encrypt(self,desc='new key list',salt_key=None):
+		from mmgen.crypto import mmgen_encrypt_iter
+		fmt_data = self.fmt_data
+		def data_f():
+			return (d.encode('utf8') for d in ([fmt_data] if fmt_data else self.format_iter()))
+		self.fmt_data = mmgen_encrypt_iter(data_f,desc,'',salt_key)
 		self.ext += '.'+g.mmenc_ext
 
 	def write_to_file(self,ask_tty=True,ask_write_default_yes=False,binary=False,desc=None):
 		fn = u'{}.{}'.format(self.id_str,self.ext)
 		ask_tty = self.has_keys and not opt.quiet
-		write_data_to_file(fn,self.fmt_data,desc or self.file_desc,ask_tty=ask_tty,binary=binary)
+		data = self.fmt_data or self.format_iter()
+		write_data_to_file(fn,data,desc or self.file_desc,ask_tty=ask_tty,binary=binary)
+
+	def new_data(self):
+		"large lists of a single address type are stored compactly"
+		if self.entry_type == AddrListEntry:
+			return AddrListStore(self.al_id.mmtype)
+		return AddrListList()
 
 	def idxs(self):
+		if type(self.data) == AddrListStore:
+			return map(AddrIdx,self.data.idx)
 		return [e.idx for e in self.data]
 
+	def iter_idxs(self):
+		if type(self.data) == AddrListStore:
+			return iter(self.data.idx)
+		return (e.idx for e in self.data)
+
 	def addrs(self):
-		return ['%s:%s'%(self.al_id.sid,e.idx) for e in self.data]
+		return ['%s:%s'%(self.al_id.sid,i) for i in self.idxs()]
 
 	def addrpairs(self):
 		return [(e.idx,e.addr) for e in self.data]
@@ -484,48 +901,76 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 	def comments(self):
 		return [e.label for e in self.data]
 
+	def reset_indexes(self):
+		self.indexes = {}
+
+	def index(self,key):
+		"""
+		lazily built hash index mapping 'idx', 'addr' or 'wif' to position in list.
+		Methods that modify entries in place must call reset_indexes()
+		"""
+		if key not in self.indexes:
+			if key == 'idx' and type(self.data) == AddrListStore:
+				vals = self.data.idx
+			elif key == 'addr' and type(self.data) == AddrListStore:
+				vals = self.data.addrs()
+			elif key == 'wif':
+				vals = (e.sec.wif if e.sec else None for e in _addrlist_records(self.data))
+			else:
+				vals = (getattr(e,key) for e in _addrlist_records(self.data))
+			d = {}
+			for n,v in enumerate(vals):
+				if v and v not in d: d[v] = n
+			self.indexes[key] = d
+		return self.indexes[key]
+
 	def entry(self,idx):
-		for e in self.data:
-			if idx == e.idx: return e
+		n = self.index('idx').get(idx)
+		if n is not None: return self.data[n]
 
 	def coinaddr(self,idx):
-		for e in self.data:
-			if idx == e.idx: return e.addr
+		e = self.entry(idx)
+		if e: return e.addr
 
 	def comment(self,idx):
-		for e in self.data:
-			if idx == e.idx: return e.label
+		e = self.entry(idx)
+		if e: return e.label
 
 	def set_comment(self,idx,comment):
-		for e in self.data:
-			if idx == e.idx:
-				e.label = comment
+		n = self.index('idx').get(idx)
+		if n is not None:
+			if type(self.data) == AddrListStore: # entries are read-only copies
+				r = self.data.get_record(n)._asdict()
+				r['label'] = comment
+				self.data[n] = AddrListEntry(**r)
+			else:
+				self.data[n].label = comment
 
 	def make_reverse_dict(self,coinaddrs):
-		d,b = MMGenDict(),coinaddrs
-		for e in self.data:
-			try:
-				d[b[b.index(e.addr)]] = MMGenID('{}:{}'.format(self.al_id,e.idx)),e.label
-			except: pass
+		d,ix = MMGenDict(),self.index('addr')
+		for a in coinaddrs:
+			if a in ix:
+				e = self.data[ix[a]]
+				d[a] = MMGenID('{}:{}'.format(self.al_id,e.idx)),e.label
 		return d
 
 	def remove_dup_keys(self,cmplist):
 		assert self.has_keys
-		pop_list = []
-		for n,d in enumerate(self.data):
-			for e in cmplist.data:
-				if e.sec.wif == d.sec.wif:
-					pop_list.append(n)
+		wifs = cmplist.index('wif')
+		pop_list = [n for n,d in enumerate(_addrlist_records(self.data)) if d.sec.wif in wifs]
 		for n in reversed(pop_list): self.data.pop(n)
+		self.reset_indexes()
 		if pop_list:
-			vmsg(self.msgs['removed_dup_keys'] % (len(pop_list),suf(removed,'s')))
+			vmsg(self.msgs['removed_dup_keys'] % (len(pop_list),suf(pop_list,'s')))
 
 	def add_wifs(self,key_list):
 		if not key_list: return
+		ix = key_list.index('addr')
 		for d in self.data:
-			for e in key_list.data:
-				if e.addr and e.sec and e.addr == d.addr:
-					d.sec = e.sec
+			if d.addr in ix:
+				e = key_list.data[ix[d.addr]]
+				if e.sec: d.sec = e.sec
+		self.reset_indexes()
 
 	def list_missing(self,key):
 		return [d.addr for d in self.data if not getattr(d,key)]
@@ -534,12 +979,18 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 		kg = KeyGenerator('std')
 		ag = AddrGenerator('p2pkh')
 		d = self.data
-		for n,e in enumerate(d,1):
+		pubkeys = kg.to_pubbin_batch([e.sec for e in d])
+		for n,(e,pb) in enumerate(zip(d,pubkeys),1):
 			qmsg_r('\rGenerating addresses from keylist: %s/%s' % (n,len(d)))
-			e.addr = ag.to_addr(kg.to_pubhex(e.sec))
+			e.addr = ag.pubbin2addr(pb)
 		qmsg('\rGenerated addresses from keylist: %s/%s ' % (n,len(d)))
+		self.reset_indexes()
 
 	def format(self,enable_comments=False):
+		self.fmt_data = u''.join(self.format_iter(enable_comments=enable_comments))
+
+	def format_iter(self,enable_comments=False,chunksize=1000):
+		"yield the formatted list as unicode strings, 'chunksize' entries at a time"
 
 		out = [self.msgs['file_header']+'\n']
 		if self.chksum:
@@ -560,7 +1011,7 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 		out.append(u'{} {{'.format(lbl))
 
 		fs = '  {:<%s}  {:<34}{}' % len(str(self.data[-1].idx))
-		for e in self.data:
+		for n,e in enumerate(_addrlist_records(self.data),1):
 			c = ' '+e.label if enable_comments and e.label else ''
 			if type(self) == KeyList:
 				out.append(fs.format(e.idx,'{} {}'.format(self.al_id.mmtype.wif_label,e.sec.wif),c))
@@ -574,23 +1025,33 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 					for k in ('viewkey','wallet_passwd'):
 						v = getattr(e,k)
 						if v: out.append(fs.format('','{}: {}'.format(k,v),c))
+			if n % chunksize == 0:
+				yield u''.join([l.rstrip()+'\n' for l in out])
+				out = []
 
 		out.append('}')
-		self.fmt_data = '\n'.join([l.rstrip() for l in out]) + '\n'
+		yield u''.join([l.rstrip()+'\n' for l in out])
 
 	def parse_file_body(self,lines):
+		"parse an iterable of body lines in a single pass"
 
-		ret = AddrListList()
+		ret = self.new_data()
 		le = self.entry_type
+		lines = iter(lines)
 
-		def get_line():
-			ret = lines.pop(0).split(None,2)
+		def next_line():
+			line = next(lines,None)
+			assert line != None,'Unexpected end of file body'
+			return line
+
+		def get_line(line=None):
+			ret = (line or next_line()).split(None,2)
 			if ret[0] == 'orig_hex:': # hacky
-				return lines.pop(0).split(None,2)
+				return next_line().split(None,2)
 			return ret
 
-		while lines:
-			d = get_line()
+		for line in lines:
+			d = get_line(line)
 
 			assert is_mmgen_idx(d[0]),"'%s': invalid address num. in line: '%s'" % (d[0],' '.join(d))
 			assert self.check_format(d[1]),"'{}': invalid {}".format(d[1],self.data_desc)
@@ -611,17 +1072,59 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 			ret.append(a)
 
 		if self.has_keys and keypress_confirm('Check key-to-address validity?'):
-			kg = KeyGenerator(self.al_id.mmtype)
-			ag = AddrGenerator(self.al_id.mmtype)
-			llen = len(ret)
-			for n,e in enumerate(ret):
-				msg_r('\rVerifying keys %s/%s' % (n+1,llen))
-				assert e.addr == ag.to_addr(kg.to_pubhex(e.sec)),(
-					"Key doesn't match address!\n  %s\n  %s" % (e.sec.wif,e.addr))
-			msg(' - done')
+			self.check_keys(ret)
 
 		return ret
 
+	def check_keys_mp(self,data,jobs):
+		"split data into contiguous slices, one per worker, yielding results as they arrive"
+		import multiprocessing as mp
+		from select import select
+		n = (len(data) + jobs - 1) / jobs
+		workers = {}
+		for i in range(jobs):
+			r,w = mp.Pipe(duplex=False)
+			p = mp.Process(target=_keychk_worker,args=(w,data[i*n:(i+1)*n],self.al_id.mmtype))
+			p.daemon = True
+			p.start()
+			w.close()
+			workers[r] = (p,i*n)
+		try:
+			while workers:
+				for r in select(workers.keys(),[],[])[0]:
+					p,offset = workers[r]
+					try: nchk,bad = r.recv()
+					except EOFError:
+						del workers[r]
+						p.join()
+						if p.exitcode:
+							die(2,'Key verification worker process exited with error')
+						continue
+					yield nchk,(None if bad == None else offset + bad)
+		finally: # stop remaining workers on mismatch or error
+			for p,offset in workers.values(): p.terminate()
+
+	def check_keys(self,data):
+		"check that keys match addresses, stopping at the first mismatch found"
+		llen = len(data)
+		jobs = min(opt.jobs or 1,llen) if g.platform == 'linux' else 1
+		KeyGenerator(self.al_id.mmtype) # display any warnings only once
+		if jobs > 1:
+			res = self.check_keys_mp(data,jobs)
+		else:
+			res = _gen_key_chk_data(data,self.al_id.mmtype)
+		done = 0
+		for nchk,bad in res:
+			if bad != None:
+				res.close()
+				e = data[bad]
+				msg('')
+				raise AssertionError,"Key doesn't match address at index {}!\n  {}\n  {}".format(
+					e.idx,e.sec.wif,e.addr)
+			done += nchk
+			msg_r('\rVerifying keys %s/%s' % (done,llen))
+		msg(' - done')
+
 	def parse_file(self,fn,buf=[],exit_on_error=True):
 
 		def parse_addrfile_label(lbl): # we must maintain backwards compat, so parse is tricky
@@ -649,14 +1152,25 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 			m = '{} address file format, but base coin is {}!'
 			assert base_coin == g.proto.base_coin, m.format(base_coin,g.proto.base_coin)
 
-		lines = get_lines_from_file(fn,self.data_desc+' data',trim_comments=True)
+		lines = get_lines_from_file_iter(fn,self.data_desc+' data',trim_comments=True)
+
+		def gen_body_lines(): # body lines, checking for the closing brace
+			n,last = 0,None
+			for last in lines:
+				if last == '}': break
+				n += 1
+				yield last
+			assert n, 'Too few lines in address file ({})'.format(n+(last!=None)+1)
+			assert last == '}', "'{}': invalid last line".format(last)
+			for line in lines:
+				raise ValueError,"'{}': invalid line after closing brace".format(line)
 
 		try:
-			assert len(lines) >= 3,  'Too few lines in address file ({})'.format(len(lines))
-			ls = lines[0].split()
-			assert 1 < len(ls) < 5,  "Invalid first line for {} file: '{}'".format(self.gen_desc,lines[0])
+			first_line = next(lines,None)
+			assert first_line != None, 'Too few lines in address file (0)'
+			ls = first_line.split()
+			assert 1 < len(ls) < 5,  "Invalid first line for {} file: '{}'".format(self.gen_desc,first_line)
 			assert ls.pop() == '{',  "'{}': invalid first line".format(ls)
-			assert lines[-1] == '}', "'{}': invalid last line".format(lines[-1])
 			sid = ls.pop(0)
 			assert is_mmgen_seed_id(sid),"'{}': invalid Seed ID".format(ls[0])
 
@@ -674,12 +1188,12 @@ Removed %s duplicate WIF key%s from keylist (also in {pnm} key-address file
 				base_coin,mmtype = 'BTC',MMGenAddrType('L')
 				check_coin_mismatch(base_coin)
 			else:
-				raise ValueError,u"'{}': Invalid first line for {} file '{}'".format(lines[0],self.gen_desc,fn)
+				raise ValueError,u"'{}': Invalid first line for {} file '{}'".format(first_line,self.gen_desc,fn)
 
 			self.al_id = AddrListID(SeedID(sid=sid),mmtype)
 
-			data = self.parse_file_body(lines[1:-1])
-			assert issubclass(type(data),list),'Invalid file body data'
+			data = self.parse_file_body(gen_body_lines())
+			assert issubclass(type(data),(list,AddrListStore)),'Invalid file body data'
 		except Exception as e:
 			m = 'Invalid address list file ({})'.format(e[0])
 			if exit_on_error: die(3,m)
@@ -743,6 +1257,7 @@ Record this checksum: it will be used to verify the password file in the future
 	gen_keys    = False
 	gen_passwds = True
 	has_keys    = False
+	use_checkpoints = False # password lists are keyed by ID string, not address type
 	ext         = 'pws'
 	pw_len      = None
 	pw_fmt      = None
@@ -754,9 +1269,10 @@ Record this checksum: it will be used to verify the password file in the future
 	chksum_rec_f = lambda foo,e: (str(e.idx), e.passwd)
 
 	def __init__(self,infile=None,seed=None,pw_idxs=None,pw_id_str=None,pw_len=None,pw_fmt=None,
-				chksum_only=False,chk_params_only=False):
+				chksum_only=False,chk_params_only=False,passwds=None):
 
 		self.update_msgs()
+		self.reset_indexes()
 
 		if infile:
 			self.data = self.parse_file(infile) # sets self.pw_id_str,self.pw_fmt,self.pw_len
@@ -768,7 +1284,10 @@ Record this checksum: it will be used to verify the password file in the future
 			self.set_pw_len(pw_len)
 			if chk_params_only: return
 			self.al_id = AddrListID(seed.sid,MMGenPasswordType('P'))
-			self.data = self.generate(seed,pw_idxs)
+			if passwds: # (idx,passwd) pairs from _passgen_worker()
+				self.data = AddrListList([PasswordListEntry(idx=i,passwd=p) for i,p in passwds])
+			else:
+				self.data = self.generate(seed,pw_idxs)
 
 		self.num_addrs = len(self.data)
 		self.fmt_data = ''
@@ -838,6 +1357,52 @@ Record this checksum: it will be used to verify the password file in the future
 		from mmgen.crypto import scramble_seed
 		return scramble_seed(seed,scramble_key,self.scramble_hash_rounds)
 
+# Worker process for gen_passwd_lists(): generates the passwords for a slice of
+# the specs and returns them through a pipe in a single message
+def _passgen_worker(conn,seed,specs,pw_idxs):
+	import signal
+	signal.signal(signal.SIGINT,signal.SIG_IGN) # let the parent handle Ctrl-C
+	opt.quiet = True
+	ret = []
+	for pw_id_str,pw_fmt,pw_len in specs:
+		pl = PasswordList(pw_id_str=pw_id_str,pw_fmt=pw_fmt,pw_len=pw_len,chk_params_only=True)
+		pl.al_id = AddrListID(seed.sid,MMGenPasswordType('P'))
+		ret.append([(int(e.idx),e.passwd) for e in pl.generate(seed,pw_idxs)])
+	conn.send(ret)
+	conn.close()
+
+def gen_passwd_lists(seed,specs,pw_idxs,jobs=1):
+	"""
+	Generate a PasswordList for each (pw_id_str,pw_fmt,pw_len) tuple in 'specs' from a
+	single seed, yielding the lists in order.  With jobs > 1, the specs are split into
+	contiguous slices, one per worker process.
+	"""
+	# multiprocess mode relies on fork(), so is unavailable on Windows
+	jobs = min(jobs,len(specs)) if g.platform == 'linux' else 1
+	if jobs < 2:
+		for pw_id_str,pw_fmt,pw_len in specs:
+			yield PasswordList(seed=seed,pw_idxs=pw_idxs,pw_id_str=pw_id_str,pw_fmt=pw_fmt,pw_len=pw_len)
+		return
+	import multiprocessing as mp
+	n = (len(specs) + jobs - 1) / jobs
+	workers = []
+	for i in range(0,len(specs),n):
+		r,w = mp.Pipe(duplex=False)
+		p = mp.Process(target=_passgen_worker,args=(w,seed,specs[i:i+n],pw_idxs))
+		p.daemon = True
+		p.start()
+		w.close()
+		workers.append((p,r,specs[i:i+n]))
+	for p,r,wspecs in workers:
+		try: data = r.recv()
+		except EOFError: data = None
+		p.join()
+		if p.exitcode or data is None:
+			die(2,'Password generation worker process exited with error')
+		for (pw_id_str,pw_fmt,pw_len),passwds in zip(wspecs,data):
+			yield PasswordList(seed=seed,pw_idxs=pw_idxs,pw_id_str=pw_id_str,pw_fmt=pw_fmt,pw_len=pw_len,
+								passwds=passwds)
+
 class AddrData(MMGenObject):
 	msgs = {
 	'too_many_acct_addresses': """
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+#
+# mmgen = Multi-Mode GENerator, command-line Bitcoin cold storage solution
+# Copyright (C)2013-2017 Philemon <mmgen-py@yandex.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+agent.py:  Seed agent for the MMGen suite
+
+The agent keeps decrypted seeds in memory for a session and hands them out over
+a Unix socket to processes of the same user, so that wallet passphrase entry and
+key derivation need not be repeated for every command.  Requests and replies are
+single lines of JSON.
+"""
+
+import os,sys,socket,struct,json,time
+from binascii import hexlify,unhexlify
+from mmgen.common import *
+from mmgen.obj import MMGenObject
+
+max_req_len = 4096
+SO_PEERCRED = getattr(socket,'SO_PEERCRED',17) # Linux value, missing from Python 2 socket module
+
+def sock_dir_err(fn):
+	"return an error message if the directory of socket 'fn' is accessible to other users"
+	d = os.path.dirname(os.path.abspath(fn))
+	st = os.stat(d)
+	if st.st_uid != os.getuid() or st.st_mode & 077:
+		return "'{}': socket directory must be owned by user and inaccessible to others".format(d)
+
+def peer_uid_ok(s):
+	"check that the process at the other end of Unix socket 's' belongs to the user"
+	if sys.platform[:5] != 'linux': # rely on socket directory permissions
+		return True
+	try:
+		pid,uid,gid = struct.unpack('3i',s.getsockopt(socket.SOL_SOCKET,SO_PEERCRED,struct.calcsize('3i')))
+	except socket.error:
+		return False
+	return uid == os.getuid()
+
+def agent_request(req,sock_fn=None,die_on_fail=False):
+	"send request 'req' to the agent and return its reply, or None if no agent is reachable"
+	fn = sock_fn or g.agent_sock
+	if not fn:
+		if die_on_fail: die(1,'MMGEN_AGENT_SOCK not set.  Is the seed agent running?')
+		return None
+	def fail(m,loud=False):
+		if die_on_fail: die(2,m)
+		(vmsg,msg)[loud](m)
+	# An agent listening on a socket that other users could have created might hand
+	# out a seed of its choosing, which only the 32-bit Seed ID check would catch
+	try:
+		err = sock_dir_err(fn) or ('socket not owned by user',None)[os.stat(fn).st_uid == os.getuid()]
+	except OSError as e:
+		return fail("Unable to contact seed agent at '{}': {}".format(fn,e.strerror))
+	s = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+	s.settimeout(10)
+	try:
+		if not err:
+			s.connect(fn)
+			if not peer_uid_ok(s): err = 'agent process not owned by user'
+		if err:
+			return fail("Refusing to use seed agent at '{}': {}".format(fn,err),loud=True)
+		s.sendall(json.dumps(req) + '\n')
+		ret = ''
+		while True:
+			d = s.recv(4096)
+			if not d: break
+			ret += d
+		return json.loads(ret)
+	except (socket.error,ValueError) as e:
+		return fail("Unable to contact seed agent at '{}': {}".format(fn,e))
+	finally:
+		s.close()
+
+def get_seed_from_agent(sid):
+	"return the seed for Seed ID 'sid' if the agent holds it, otherwise None"
+	ret = agent_request({'cmd':'get','sid':sid})
+	if not ret: return None
+	if not ret['ok']:
+		vmsg('Seed agent: {}'.format(ret['error']))
+		return None
+	from mmgen.seed import Seed
+	seed = Seed(unhexlify(ret['seed']))
+	if seed.sid != sid:
+		msg('Seed agent returned wrong seed for Seed ID {}!'.format(sid))
+		return None
+	qmsg('Seed ID {} retrieved from seed agent'.format(seed.sid.hl()))
+	return seed
+
+def harden_process():
+	"disable core dumps and ptrace attachment, lock memory to keep seeds out of swap"
+	import resource,ctypes,ctypes.util
+	resource.setrlimit(resource.RLIMIT_CORE,(0,0))
+	try:
+		libc = ctypes.CDLL(ctypes.util.find_library('c'),use_errno=True)
+	except OSError:
+		msg('WARNING: unable to load C library.  Seeds may be swapped to disk')
+		return
+	if hasattr(libc,'prctl'):
+		libc.prctl(4,0,0,0,0) # PR_SET_DUMPABLE
+	try:
+		rl = resource.getrlimit(resource.RLIMIT_MEMLOCK)
+		resource.setrlimit(resource.RLIMIT_MEMLOCK,(rl[1],rl[1]))
+	except (ValueError,resource.error):
+		pass
+	if not hasattr(libc,'mlockall') or libc.mlockall(3): # MCL_CURRENT | MCL_FUTURE
+		msg('WARNING: unable to lock agent memory ({}).  Seeds may be swapped to disk'.format(
+			os.strerror(ctypes.get_errno()) or 'unsupported'))
+
+class SeedAgent(MMGenObject):
+
+	def __init__(self,sock_fn,timeout=0):
+		self.sock_fn = sock_fn
+		self.timeout = timeout # default lifetime of added seeds in seconds (0 = unlimited)
+		self.seeds = {}        # Seed ID -> [seed data (bytearray), expiry time or None]
+		self.lock_key = os.urandom(32)
+		self.lock_hash = None
+		self.done = False
+		self.sock = None
+
+	def listen(self):
+		e = sock_dir_err(self.sock_fn)
+		if e: die(2,e)
+		if os.path.exists(self.sock_fn):
+			if agent_request({'cmd':'list'},sock_fn=self.sock_fn):
+				die(2,"A seed agent is already listening on '{}'".format(self.sock_fn))
+			os.unlink(self.sock_fn) # stale socket
+		self.sock = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+		old_mask = os.umask(077)
+		try:
+			self.sock.bind(self.sock_fn)
+		finally:
+			os.umask(old_mask)
+		self.sock.listen(5)
+
+	def remove(self,sid):
+		data = self.seeds.pop(sid)[0]
+		data[:] = '\0' * len(data)
+
+	def expire(self):
+		now = time.time()
+		for sid in [k for k,v in self.seeds.items() if v[1] and v[1] <= now]:
+			self.remove(sid)
+
+	def next_expiry(self):
+		t = [v[1] for v in self.seeds.values() if v[1]]
+		return max(min(t) - time.time(),0) if t else None
+
+	def run(self):
+		import select
+		while not self.done:
+			self.expire()
+			try:
+				r = select.select([self.sock],[],[],self.next_expiry())[0]
+			except select.error:
+				continue # interrupted by signal
+			if r:
+				conn = self.sock.accept()[0]
+				try:
+					if peer_uid_ok(conn):
+						self.handle(conn)
+				except socket.error:
+					pass
+				finally:
+					conn.close()
+		self.cleanup()
+
+	def cleanup(self):
+		for sid in self.seeds.keys(): self.remove(sid)
+		if self.sock:
+			self.sock.close()
+			self.sock = None
+			try: os.unlink(self.sock_fn)
+			except: pass
+
+	def handle(self,conn):
+		conn.settimeout(5)
+		req = ''
+		while '\n' not in req and len(req) < max_req_len:
+			d = conn.recv(max_req_len)
+			if not d: break
+			req += d
+		try:
+			req = json.loads(req)
+			ret = getattr(self,'cmd_'+req['cmd'])(req)
+		except (ValueError,KeyError,TypeError,AttributeError):
+			ret = self.err('invalid request')
+		conn.sendall(json.dumps(ret) + '\n')
+
+	def err(self,s): return {'ok':False,'error':s}
+
+	def cmd_add(self,req):
+		if self.lock_hash: return self.err('agent is locked')
+		from mmgen.seed import Seed
+		seed_bin = unhexlify(req['seed'])
+		if len(seed_bin) * 8 not in g.seed_lens: return self.err('invalid seed length')
+		sid = Seed(seed_bin).sid
+		t = self.timeout if req.get('timeout') == None else req['timeout']
+		if sid in self.seeds: self.remove(sid)
+		self.seeds[sid] = [bytearray(seed_bin),time.time() + t if t else None]
+		return {'ok':True,'sid':sid}
+
+	def cmd_get(self,req):
+		if self.lock_hash: return self.err('agent is locked')
+		self.expire()
+		if req['sid'] not in self.seeds: return self.err('Seed ID {} not found'.format(req['sid']))
+		return {'ok':True,'seed':hexlify(self.seeds[req['sid']][0])}
+
+	def cmd_list(self,req):
+		now = time.time()
+		return {'ok':True,'locked':bool(self.lock_hash),
+			'seeds':[] if self.lock_hash else
+					sorted((k,int(v[1]-now) if v[1] else None) for k,v in self.seeds.items())}
+
+	def cmd_remove(self,req):
+		if self.lock_hash: return self.err('agent is locked')
+		sids = req.get('sids') or self.seeds.keys()
+		for sid in sids:
+			if sid not in self.seeds: return self.err('Seed ID {} not found'.format(sid))
+		for sid in sids: self.remove(sid)
+		return {'ok':True,'sids':sorted(sids)}
+
+	def passwd_hash(self,passwd):
+		import hmac,hashlib
+		return hmac.new(self.lock_key,passwd.encode('utf8'),hashlib.sha256).digest()
+
+	def cmd_lock(self,req):
+		if self.lock_hash: return self.err('agent is already locked')
+		self.lock_hash = self.passwd_hash(req['passwd'])
+		return {'ok':True}
+
+	def cmd_unlock(self,req):
+		import hmac
+		if not self.lock_hash: return self.err('agent is not locked')
+		if not hmac.compare_digest(self.passwd_hash(req['passwd']),self.lock_hash):
+			time.sleep(1) # slow down guessing
+			return self.err('incorrect passphrase')
+		self.lock_hash = None
+		return {'ok':True}
+
+	def cmd_stop(self,req):
+		self.done = True
+		return {'ok':True}
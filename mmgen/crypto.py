@@ -80,39 +80,76 @@ def decrypt_seed(enc_seed,key,seed_id,key_id):
 	dmsg('Decrypted seed: {}'.format(hexlify(dec_seed)))
 	return dec_seed
 
-def encrypt_data(data,key,iv=1,desc='data',verify=True):
-	# 192-bit seed is 24 bytes -> not multiple of 16.  Must use MODE_CTR
+def _make_cipher(key,iv):
 	from Crypto.Cipher import AES
 	from Crypto.Util import Counter
-	vmsg('Encrypting {}'.format(desc))
-	c = AES.new(key,AES.MODE_CTR,counter=Counter.new(g.aesctr_iv_len*8,initial_value=iv))
-	enc_data = c.encrypt(data)
+	return AES.new(key,AES.MODE_CTR,counter=Counter.new(g.aesctr_iv_len*8,initial_value=iv))
 
-	if verify:
-		vmsg_r('Performing a test decryption of the {}...'.format(desc))
-		c = AES.new(key,AES.MODE_CTR,counter=Counter.new(g.aesctr_iv_len*8,initial_value=iv))
-		dec_data = c.decrypt(enc_data)
+def encrypt_data(data,key,iv=1,desc='data',verify=True):
+	# 192-bit seed is 24 bytes -> not multiple of 16.  Must use MODE_CTR
+	vmsg('Encrypting {}'.format(desc))
+	if verify: vmsg_r('Performing a test decryption of the {}...'.format(desc))
+	enc_data = ''.join(encrypt_data_iter([data],key,iv,desc,verify))
+	if verify: vmsg('done')
+	return enc_data
 
-		if dec_data == data: vmsg('done')
-		else:
+def encrypt_data_iter(chunks,key,iv=1,desc='data',verify=True):
+	"encrypt the iterable 'chunks' as a single stream, yielding the encrypted chunks"
+	c = _make_cipher(key,iv)
+	c_chk = _make_cipher(key,iv) if verify else None
+	for d in chunks:
+		enc_d = c.encrypt(d)
+		if verify and c_chk.decrypt(enc_d) != d:
 			die(2,"ERROR.\nDecrypted {s} doesn't match original {s}".format(s=desc))
-
-	return enc_data
+		yield enc_d
 
 def decrypt_data(enc_data,key,iv=1,desc='data'):
-	from Crypto.Cipher import AES
-	from Crypto.Util import Counter
 	vmsg_r('Decrypting {} with key...'.format(desc))
-	c = AES.new(key,AES.MODE_CTR,counter=Counter.new(g.aesctr_iv_len*8,initial_value=iv))
-	return c.decrypt(enc_data)
+	return _make_cipher(key,iv).decrypt(enc_data)
+
+# optional C ROMix function for multithreaded scrypt, built by setup.py
+try:
+	from mmgen.scryptromix import romix as _scrypt_romix
+except:
+	_scrypt_romix = None
 
 def scrypt_hash_passphrase(passwd,salt,hash_preset,buflen=32):
-	import scrypt
 	# Buflen arg is for brainwallets only, which use this function to generate
 	# the seed directly.
 	N,r,p = get_hash_params(hash_preset)
+	if _scrypt_romix and p > 1:
+		from multiprocessing import cpu_count
+		threads = min(p,g.scrypt_threads or cpu_count(),g.scrypt_max_mem * 2**20 / (128 * r * 2**N))
+		if threads > 1:
+			return scrypt_hash_mt(passwd,salt,2**N,r,p,buflen,threads)
+	import scrypt
 	return scrypt.hash(passwd,salt,2**N,r,p,buflen=buflen)
 
+def scrypt_hash_mt(passwd,salt,N,r,p,buflen,threads):
+	"""
+	Compute scrypt (RFC 7914) with the 'p' independent ROMix lanes divided among
+	'threads' threads.  The output is identical to that of scrypt.hash().  Each
+	thread needs 128*r*N bytes of memory.
+	"""
+	from hashlib import pbkdf2_hmac
+	from threading import Thread
+	if type(passwd) == unicode: passwd = passwd.encode('utf8')
+	if type(salt) == unicode: salt = salt.encode('utf8')
+	bl = 128 * r
+	B = pbkdf2_hmac('sha256',passwd,salt,1,p*bl)
+	lanes,errors = [B[i*bl:(i+1)*bl] for i in range(p)],[]
+	def run(n):
+		try:
+			for i in range(n,p,threads):
+				lanes[i] = _scrypt_romix(lanes[i],N)
+		except Exception as e:
+			errors.append(e)
+	tlist = [Thread(target=run,args=(n,)) for n in range(threads)]
+	for t in tlist: t.start()
+	for t in tlist: t.join()
+	if errors: raise errors[0]
+	return pbkdf2_hmac('sha256',passwd,''.join(lanes),1,buflen)
+
 def make_key(passwd,salt,hash_preset,desc='encryption key',from_what='passphrase',verbose=False):
 	if from_what: desc += ' from '
 	if opt.verbose or verbose:
@@ -122,6 +159,89 @@ def make_key(passwd,salt,hash_preset,desc='encryption key',from_what='passphrase
 	dmsg('Key: {}'.format(hexlify(key)))
 	return key
 
+def _time_make_key(hash_preset):
+	"""
+	Time make_key() for 'hash_preset', returning (secs,peak_mem).  On Linux, the
+	key is made in a forked child, whose peak RSS is the memory usage.
+	"""
+	import time
+	passwd,salt = os.urandom(32),os.urandom(_salt_len)
+	if g.platform != 'linux':
+		N,r,p = get_hash_params(hash_preset)
+		t = time.time()
+		make_key(passwd,salt,hash_preset,from_what='')
+		return time.time() - t,128 * r * 2**N # lower bound: one scrypt lane
+	rd,wr = os.pipe()
+	pid = os.fork()
+	if pid == 0:
+		os.close(rd)
+		try:
+			t = time.time()
+			if hash_preset: make_key(passwd,salt,hash_preset,from_what='')
+			os.write(wr,repr(time.time() - t))
+		finally:
+			os._exit(0)
+	os.close(wr)
+	secs = os.read(rd,64)
+	os.close(rd)
+	pid,status,ru = os.wait4(pid,0)
+	if status or not secs:
+		die(2,"Hash preset '{}': benchmark process exited with error".format(hash_preset))
+	return float(secs),ru.ru_maxrss * 1024 # ru_maxrss is in kB on Linux
+
+def bench_hash_presets(max_secs=60):
+	"""
+	Measure key generation time and memory for each hash preset, in ascending
+	order.  Presets whose estimated time, extrapolated from the previous one,
+	exceeds 'max_secs' are skipped.  Returns a dict of preset: (secs,mem_bytes).
+	"""
+	base_mem = _time_make_key(None)[1] if g.platform == 'linux' else 0
+	ret,prev_cost = {},None
+	for hp in sorted(g.hash_presets,key=int):
+		N,r,p = get_hash_params(hp)
+		cost = 2**N * r * p
+		if prev_cost and ret[prev_hp][0] * cost / prev_cost > max_secs:
+			vmsg("Skipping hash preset '{}' and above (estimated time > {}s)".format(hp,max_secs))
+			break
+		msg_r("\rTesting hash preset '{}'...".format(hp))
+		secs,mem = _time_make_key(hp)
+		ret[hp] = (secs,max(mem - base_mem,0))
+		prev_hp,prev_cost = hp,cost
+	msg_r('\r' + ' ' * 32 + '\r')
+	return ret
+
+def get_hash_preset_bench_fn():
+	return os.path.join(g.data_dir_root,'hash_preset_bench.json')
+
+def save_hash_preset_bench(bench):
+	import json
+	check_or_create_dir(g.data_dir_root)
+	fn = get_hash_preset_bench_fn()
+	with open(fn,'wb') as f:
+		json.dump({'scrypt_threads': g.scrypt_threads,'presets': bench},f,indent=1,sort_keys=True)
+	return fn
+
+def load_hash_preset_bench():
+	"return the saved benchmark results as a dict of preset: (secs,mem_bytes), or None"
+	import json
+	try:
+		with open(get_hash_preset_bench_fn(),'rb') as f:
+			d = json.load(f)['presets']
+		return dict((str(k),(float(v[0]),int(v[1]))) for k,v in d.items() if k in g.hash_presets)
+	except:
+		return None
+
+def recommend_hash_preset(bench,target_secs):
+	"return the strongest benchmarked preset that takes no more than 'target_secs', or None"
+	ok = [hp for hp in bench if bench[hp][0] <= target_secs]
+	return max(ok,key=int) if ok else None
+
+def hash_preset_times_msg():
+	bench = load_hash_preset_bench()
+	if not bench: return ''
+	return 'Expected unlock times on this machine: ' + ', '.join(
+		"'{}': {:.2f}s".format(hp,bench[hp][0]) for hp in sorted(bench,key=int))
+
 def _get_random_data_from_user(uchars):
 	m = 'Enter {} random symbols' if opt.quiet else crmsg['usr_rand_notice']
 	msg(m.format(uchars))
@@ -171,6 +291,8 @@ def get_random(length):
 def get_hash_preset_from_user(hp=g.hash_preset,desc='data'):
 	prompt = """Enter hash preset for {},
  or hit ENTER to accept the default value ('{}'): """.format(desc,hp)
+	m = hash_preset_times_msg()
+	if m: msg(m)
 	while True:
 		ret = my_raw_input(prompt)
 		if ret:
@@ -184,19 +306,65 @@ def get_hash_preset_from_user(hp=g.hash_preset,desc='data'):
 
 _salt_len,_sha256_len,_nonce_len = 32,32,32
 
-def mmgen_encrypt(data,desc='data',hash_preset=''):
-	salt  = get_random(_salt_len)
-	iv    = get_random(g.aesctr_iv_len)
-	nonce = get_random(_nonce_len)
-	hp    = hash_preset or get_hash_preset_from_user('3',desc)
-	m     = ('user-requested','default')[hp=='3']
+def get_encrypt_key(desc='data',hash_preset=''):
+	"""
+	Get a new passphrase from the user and return a salt and the key made from
+	them.  Passing the result to mmgen_encrypt_iter() encrypts several files with
+	a single passphrase entry and key derivation.
+	"""
+	salt = get_random(_salt_len)
+	hp   = hash_preset or get_hash_preset_from_user('3',desc)
+	m    = ('user-requested','default')[hp=='3']
 	vmsg('Encrypting {}'.format(desc))
 	qmsg("Using {} hash preset of '{}'".format(m,hp))
 	passwd = get_new_passphrase(desc,{})
-	key    = make_key(passwd,salt,hp)
+	return salt,make_key(passwd,salt,hp)
+
+def _get_encrypt_params(desc,hash_preset,salt_key=None):
+	"return the salt, IV, nonce and key for a new encrypted MMGen file"
+	salt,key = salt_key or get_encrypt_key(desc,hash_preset)
+	iv    = get_random(g.aesctr_iv_len) # a fresh IV for each file, so a shared key is safe in CTR mode
+	nonce = get_random(_nonce_len)
+	return salt,iv,nonce,key
+
+def mmgen_encrypt(data,desc='data',hash_preset=''):
+	salt,iv,nonce,key = _get_encrypt_params(desc,hash_preset)
 	enc_d  = encrypt_data(sha256(nonce+data).digest()+nonce+data,key,int(hexlify(iv),16),desc=desc)
 	return salt+iv+enc_d
 
+def _skip_bytes(chunks,n):
+	"yield the chunks of iterator 'chunks' minus their first 'n' bytes"
+	for d in chunks:
+		if n >= len(d):
+			n -= len(d)
+		else:
+			yield d[n:]
+			n = 0
+
+# Same output format as mmgen_encrypt(), for data too large to be held in memory.
+# 'data_f' is a function returning an iterator over the plaintext chunks.  It's
+# called twice, as the plaintext hash precedes the data.  The data is hashed again
+# as it's encrypted, and the generator dies if it has changed since the first pass.
+# 'salt_key' is a (salt,key) pair returned by get_encrypt_key().  Returns a
+# generator yielding the encrypted data in chunks.
+def mmgen_encrypt_iter(data_f,desc='data',hash_preset='',salt_key=None):
+	from itertools import chain
+	salt,iv,nonce,key = _get_encrypt_params(desc,hash_preset,salt_key)
+	h = sha256(nonce)
+	for d in data_f(): h.update(d)
+	chk = h.digest()
+
+	def gen_data():
+		h = sha256(nonce)
+		for d in data_f():
+			h.update(d)
+			yield d
+		if h.digest() != chk:
+			die(2,'{} changed during encryption'.format(capfirst(desc)))
+
+	enc_d = encrypt_data_iter(chain([chk+nonce],gen_data()),key,int(hexlify(iv),16),desc=desc)
+	return chain([salt+iv],enc_d)
+
 def mmgen_decrypt(data,desc='data',hash_preset=''):
 	dstart = _salt_len + g.aesctr_iv_len
 	salt   = data[:_salt_len]
@@ -216,6 +384,57 @@ def mmgen_decrypt(data,desc='data',hash_preset=''):
 		msg('Incorrect passphrase or hash preset')
 		return False
 
+# Streaming counterpart of mmgen_decrypt().  'enc_data_f' is a function returning
+# an iterator over the encrypted data in chunks.  It's called twice: the data is
+# decrypted and checked against the plaintext hash first, so that no output is
+# produced if the passphrase is wrong.  The output pass checks the hash again, and
+# the generator dies after the last chunk if the data has changed in between.
+# Returns a generator yielding the decrypted data in chunks, or False.
+def mmgen_decrypt_iter(enc_data_f,desc='data',hash_preset=''):
+	dstart,head = _salt_len + g.aesctr_iv_len,''
+	for d in enc_data_f():
+		head += d
+		if len(head) >= dstart + _sha256_len + _nonce_len: break
+	else:
+		die(2,'Encrypted {} is too short'.format(desc))
+	salt   = head[:_salt_len]
+	iv     = head[_salt_len:dstart]
+	vmsg('Preparing to decrypt {}'.format(desc))
+	hp = hash_preset or get_hash_preset_from_user('3',desc)
+	m  = ('user-requested','default')[hp=='3']
+	qmsg("Using {} hash preset of '{}'".format(m,hp))
+	passwd = get_mmgen_passphrase(desc)
+	key    = make_key(passwd,salt,hp)
+
+	def gen_dec_data():
+		c = _make_cipher(key,int(hexlify(iv),16))
+		return (c.decrypt(d) for d in _skip_bytes(enc_data_f(),dstart))
+
+	vmsg_r('Decrypting {} with key...'.format(desc))
+	h,chk = sha256(),''
+	for d in gen_dec_data():
+		if len(chk) < _sha256_len:
+			n = _sha256_len - len(chk)
+			chk,d = chk + d[:n],d[n:]
+		h.update(d)
+	def gen_output():
+		h = sha256()
+		def gen_hashed():
+			for d in _skip_bytes(gen_dec_data(),_sha256_len):
+				h.update(d)
+				yield d
+		for d in _skip_bytes(gen_hashed(),_nonce_len):
+			yield d
+		if h.digest() != chk:
+			die(2,'{} changed during decryption'.format(capfirst(desc)))
+
+	if chk == h.digest():
+		vmsg('OK')
+		return gen_output()
+	else:
+		msg('Incorrect passphrase or hash preset')
+		return False
+
 def mmgen_decrypt_retry(d,desc='data'):
 	while True:
 		d_dec = mmgen_decrypt(d,desc)
@@ -115,7 +115,7 @@ class g(object):
 	required_opts = (
 		'quiet','verbose','debug','outdir','echo_passphrase','passwd_file','stdout',
 		'show_hash_presets','label','keep_passphrase','keep_hash_preset','yes',
-		'brain_params','b16','usr_randchars','coin','bob','alice','key_generator'
+		'brain_params','b16','usr_randchars','coin','bob','alice','key_generator','jobs'
 	)
 	incompatible_opts = (
 		('base32','hex'), # mmgen-passgen
@@ -129,7 +129,8 @@ class g(object):
 	cfg_file_opts = (
 		'color','debug','hash_preset','http_timeout','no_license','rpc_host','rpc_port',
 		'quiet','tx_fee_adj','usr_randchars','testnet','rpc_user','rpc_password',
-		'daemon_data_dir','force_256_color','regtest',
+		'daemon_data_dir','force_256_color','regtest','addr_checkpoint_interval',
+		'scrypt_threads','scrypt_max_mem','hash_preset_target_secs','agent_timeout',
 		'btc_max_tx_fee','ltc_max_tx_fee','bch_max_tx_fee'
 	)
 	env_opts = (
@@ -140,6 +141,9 @@ class g(object):
 		'MMGEN_FORCE_256_COLOR',
 		'MMGEN_DISABLE_HOLD_PROTECT',
 		'MMGEN_MIN_URANDCHARS',
+		'MMGEN_ADDR_CHECKPOINT_INTERVAL',
+		'MMGEN_SCRYPT_THREADS',
+		'MMGEN_AGENT_SOCK',
 		'MMGEN_NO_LICENSE',
 		'MMGEN_RPC_HOST',
 		'MMGEN_TESTNET'
@@ -151,7 +155,7 @@ class g(object):
 
 	# Global var sets user opt:
 	global_sets_opt = ['minconf','seed_len','hash_preset','usr_randchars','debug',
-						'quiet','tx_confs','tx_fee_adj','key_generator']
+						'quiet','tx_confs','tx_fee_adj','key_generator','jobs']
 
 	passwd_max_tries = 5
 
@@ -165,9 +169,21 @@ class g(object):
 	aesctr_iv_len  = 16
 	hincog_chk_len = 8
 
-	key_generators = 'python-ecdsa','secp256k1' # '1','2'
+	key_generators = 'python-native','secp256k1' # '1','2'
 	key_generator  = 2 # secp256k1 is default
 
+	jobs = 1 # number of worker processes for address generation
+
+	addr_checkpoint_interval = 0 # save seed hash chain checkpoints every n rounds (0 = disabled)
+
+	addr_cache_size = 10000 # max. number of address verification results to memoize
+
+	scrypt_threads = 0    # number of threads for the scrypt 'p' lanes (0 = one per CPU)
+	scrypt_max_mem = 1024 # max. memory in MB used by parallel scrypt lanes
+	hash_preset_target_secs = 0.0 # pick default hash preset from benchmark results (0 = disabled)
+	agent_sock = ''       # seed agent socket, set from MMGEN_AGENT_SOCK
+	agent_timeout = 3600  # seconds the seed agent keeps a seed (0 = unlimited)
+
 	hash_presets = {
 #   Scrypt params:
 #   ID    N   p  r
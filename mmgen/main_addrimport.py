@@ -86,7 +86,7 @@ if len(cmd_args) == 1:
 	infile = cmd_args[0]
 	check_infile(infile)
 	if opt.addrlist:
-		al = AddrList(addrlist=get_lines_from_file(
+		al = AddrList(addrlist=get_lines_from_file_iter(
 			infile,
 			'non-{pnm} addresses'.format(pnm=g.proj_name),
 			trim_comments=True))
@@ -120,7 +120,7 @@ if opt.rescan: import threading
 
 msg('Importing {} address{} from {}{}'.format(
 		len(al.data),
-		suf(al.data,'es'),
+		suf(len(al.data),'es'),
 		infile,
 		('',' (batch mode)')[bool(opt.batch)]))
 
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+#
+# mmgen = Multi-Mode GENerator, command-line Bitcoin cold storage solution
+# Copyright (C)2013-2017 Philemon <mmgen-py@yandex.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+mmgen-agent: Keep unlocked seeds in memory for a session
+"""
+
+import os
+from mmgen.common import *
+from mmgen.seed import SeedSource
+from mmgen.obj import SeedID
+from mmgen.agent import SeedAgent,agent_request
+
+cmds = ('start','add','list','remove','lock','unlock','stop')
+
+opts_data = lambda: {
+	'desc': 'Keep unlocked {pnm} seeds in memory for a session'.format(pnm=g.proj_name),
+	'usage':'[opts] start | add [seed source ...] | list | remove [Seed ID ...] | lock | unlock | stop',
+	'options': """
+-h, --help            Print this help message
+--, --longhelp        Print help message for long options (common options)
+-b, --brain-params=l,p Use seed length 'l' and hash preset 'p' for brainwallet
+                      input
+-e, --echo-passphrase Echo passphrases and other user input to screen
+-f, --foreground      Don't fork into the background ('start')
+-i, --in-fmt=      f  Input seed data in format 'f' ('add')
+-H, --hidden-incog-input-params=f,o  Read hidden incognito data from file
+                      'f' at offset 'o' (comma-separated)
+-O, --old-incog-fmt   Specify old-format incognito input
+-l, --seed-len=    l  Specify wallet seed length of 'l' bits.  This option
+                      is required only for brainwallet and incognito inputs
+                      with non-standard (< {g.seed_len}-bit) seed lengths
+-p, --hash-preset= p  Use the scrypt hash parameters defined by preset 'p'
+                      for password hashing (default: '{g.hash_preset}')
+-P, --passwd-file= f  Get wallet passphrase from file 'f'
+-q, --quiet           Produce quieter output; suppress some warnings
+-s, --socket=      s  Listen on socket 's' ('start').  Default: a socket in a
+                      newly created private directory
+-t, --timeout=     t  Forget seeds 't' seconds after they are added ('start',
+                      'add').  Default: {g.agent_timeout} (0 = never)
+-v, --verbose         Produce more verbose output
+""".format(g=g),
+	'notes': """
+
+COMMANDS:
+  start   Start the agent and print the shell commands that set the
+          MMGEN_AGENT_SOCK environment variable, e.g. 'eval $({pn} start)'
+  add     Decrypt a seed source (the default wallet if none is given) and
+          hand its seed to the agent
+  list    List the Seed IDs held by the agent with their remaining lifetimes
+  remove  Remove the given seeds from the agent (all seeds if none are given)
+  lock    Lock the agent with a passphrase.  A locked agent hands out no
+          seeds until unlocked
+  unlock  Unlock the agent
+  stop    Remove all seeds and stop the agent
+
+While MMGEN_AGENT_SOCK is set, commands requiring a seed whose Seed ID is
+known beforehand (transaction signing, or an {pnm} wallet given as seed
+source) fetch it from the agent instead of asking for a passphrase.
+
+The agent accepts connections only from processes of the same user, keeps
+its memory locked where the system permits and disables core dumps.  Clients
+likewise refuse an agent socket unless it and its directory are owned by the
+user and the directory is inaccessible to others.
+Seeds are erased from the agent's memory when removed or expired.
+
+{n_pw}
+
+FMT CODES:
+  {f}
+""".format(
+	pn=g.prog_name,
+	pnm=g.proj_name,
+	f='\n  '.join(SeedSource.format_fmt_codes().splitlines()),
+	n_pw=help_notes('passwd'),
+	)
+}
+
+cmd_args = opts.init(opts_data)
+
+if not cmd_args or cmd_args[0] not in cmds: opts.usage()
+cmd,cmd_args = cmd_args[0],cmd_args[1:]
+if cmd_args and cmd not in ('add','remove'): opts.usage()
+
+timeout = None
+if opt.timeout != None:
+	timeout = int(opt.timeout) if is_int(opt.timeout) and int(opt.timeout) >= 0 else \
+		die(1,"'{}': invalid timeout (must be a non-negative integer)".format(opt.timeout))
+
+def request(req):
+	ret = agent_request(req,die_on_fail=True)
+	if not ret['ok']: die(2,'Seed agent: {}'.format(ret['error']))
+	return ret
+
+def get_lock_passwd(desc,verify):
+	if opt.passwd_file:
+		return ' '.join(get_words_from_file(opt.passwd_file,'lock passphrase'))
+	pw = ' '.join(get_words_from_user('Enter {}: '.format(desc)))
+	if verify and pw != ' '.join(get_words_from_user('Repeat passphrase: ')):
+		die(1,'Passphrases do not match')
+	return pw
+
+if cmd == 'start':
+	import tempfile
+	sock_dir = None
+	if opt.socket:
+		sock_fn = os.path.abspath(opt.socket)
+	else:
+		sock_dir = tempfile.mkdtemp(prefix='mmgen-agent-') # mode 0700
+		sock_fn = os.path.join(sock_dir,'agent.sock')
+	agent = SeedAgent(sock_fn,g.agent_timeout if timeout == None else timeout)
+	agent.listen()
+	pid = os.getpid() if opt.foreground else os.fork()
+	if pid:
+		Msg('MMGEN_AGENT_SOCK={}; export MMGEN_AGENT_SOCK;'.format(sock_fn))
+		msg('Seed agent pid {}'.format(pid))
+		sys.stdout.flush()
+		if not opt.foreground: os._exit(0)
+	else:
+		os.setsid()
+		fd = os.open(os.devnull,os.O_RDWR)
+		for i in (0,1,2): os.dup2(fd,i)
+	import signal
+	def stop(signum,frame): agent.done = True
+	for s in (signal.SIGTERM,signal.SIGHUP,signal.SIGINT): signal.signal(s,stop)
+	from mmgen.agent import harden_process
+	harden_process()
+	try:
+		agent.run()
+	finally:
+		agent.cleanup()
+		if sock_dir: os.rmdir(sock_dir)
+	os._exit(0)
+elif cmd == 'add':
+	for sf in cmd_args or [get_seed_file([],1)]:
+		ss = SeedSource(sf)
+		ret = request({'cmd':'add','seed':ss.seed.hexdata,'timeout':timeout})
+		msg('Added Seed ID {} to seed agent'.format(ss.seed.sid.hl()))
+elif cmd == 'list':
+	ret = request({'cmd':'list'})
+	if ret['locked']:
+		msg('Seed agent is locked')
+	elif not ret['seeds']:
+		msg('Seed agent holds no seeds')
+	for sid,secs in ret['seeds']:
+		Msg('{}  {}'.format(sid,'no timeout' if secs == None else secs_to_hms(secs)))
+elif cmd == 'remove':
+	ret = request({'cmd':'remove','sids':[SeedID(sid=s) for s in cmd_args]})
+	msg('Removed {} seed{} from seed agent'.format(len(ret['sids']),suf(ret['sids'])))
+elif cmd == 'lock':
+	request({'cmd':'lock','passwd':get_lock_passwd('passphrase to lock seed agent',True)})
+	msg('Seed agent locked')
+elif cmd == 'unlock':
+	request({'cmd':'unlock','passwd':get_lock_passwd('passphrase to unlock seed agent',False)})
+	msg('Seed agent unlocked')
+elif cmd == 'stop':
+	request({'cmd':'stop'})
+	msg('Seed agent stopped')
@@ -23,10 +23,12 @@ mmgen-passgen: Generate a series or range of passwords from an MMGen
 
 from mmgen.common import *
 from mmgen.crypto import *
-from mmgen.addr import PasswordList,AddrIdxList
+from mmgen.addr import PasswordList,AddrIdxList,gen_passwd_lists
 from mmgen.seed import SeedSource
 from mmgen.obj import MMGenPWIDString
 
+combined_ext = 'pwlists' # not 'pws': the combined file can't be read back by MMGen
+
 dfl_len = {
 	'b58': PasswordList.pw_info['b58']['dfl_len'],
 	'b32': PasswordList.pw_info['b32']['dfl_len'],
@@ -37,15 +39,21 @@ opts_data = lambda: {
 	'sets': [('print_checksum',True,'quiet',True)],
 	'desc': """Generate a range or list of passwords from an {pnm} wallet,
                   mnemonic, seed or brainwallet for the given ID string""".format(pnm=g.proj_name),
-	'usage':'[opts] [seed source] <ID string> <index list or range(s)>',
+	'usage':'[opts] [seed source] <ID string> <index list or range(s)>\n' +
+	'       [opts] -B <batch file> [seed source] <index list or range(s)>',
 	'options': """
 -h, --help            Print this help message
 --, --longhelp        Print help message for long options (common options)
 -b, --base32          Generate passwords in Base32 format instead of Base58
+-B, --batch-file=  f  Generate a password list for each ID string in file 'f'
+                      (see BATCH MODE below)
+-c, --combine         In batch mode, write all password lists to a single file
 -x, --hex             Generate passwords in raw hex format instead of Base58
 -d, --outdir=      d  Output files to directory 'd' instead of working dir
 -e, --echo-passphrase Echo passphrase or mnemonic to screen upon entry
 -i, --in-fmt=      f  Input is from wallet format 'f' (see FMT CODES below)
+-j, --jobs=        n  In batch mode, use 'n' worker processes for password
+                      generation (default: {g.jobs})
 -H, --hidden-incog-input-params=f,o  Read hidden incognito data from file
                       'f' at offset 'o' (comma-separated)
 -O, --old-incog-fmt   Specify old-format incognito input
@@ -98,6 +106,26 @@ EXAMPLE:
   Alice doesn't need to worry about password reuse.
 
 
+                               BATCH MODE
+
+With --batch-file, the seed is unlocked once and a password list is generated
+for each line of the batch file, using the same index list for all IDs.  Each
+line contains an ID string, optionally followed by a password format ('b58',
+'b32' or 'hex') and length.  Omitted values are taken from the command line.
+Everything following a hash symbol '#' is a comment and ignored.
+
+Each list is written to its own file, unless --combine is specified, in which
+case the lists are written one after another to a single file with extension
+'.{cx}'.  This file is for printing or archiving only: it can't be read back
+by {pnm} commands such as 'mmgen-tool passwdfile_chksum'.  Output files may be
+encrypted, in which case one passphrase is used for all of them.  Example
+batch file:
+
+  alice@nowhere.com
+  alice@work.com b32
+  bob@nowhere.com b58 16
+
+
                       NOTES FOR ALL GENERATOR COMMANDS
 
 {n_pw}
@@ -107,7 +135,7 @@ EXAMPLE:
 FMT CODES:
   {n_fmt}
 """.format(
-		o=opts,g=g,d58=dfl_len['b58'],d32=dfl_len['b32'],
+		o=opts,g=g,d58=dfl_len['b58'],d32=dfl_len['b32'],cx=combined_ext,pnm=g.proj_name,
 		ml=MMGenPWIDString.max_len,
 		fs="', '".join(MMGenPWIDString.forbidden),
 		n_pw=help_notes('passwd'),
@@ -118,29 +146,59 @@ FMT CODES:
 
 cmd_args = opts.init(opts_data,add_opts=['b16'])
 
-if len(cmd_args) < 2: opts.usage()
+if len(cmd_args) < (2,1)[bool(opt.batch_file)]: opts.usage()
 
 pw_idxs = AddrIdxList(fmt_str=cmd_args.pop())
 
-pw_id_str = cmd_args.pop()
-
-sf = get_seed_file(cmd_args,1)
-
 pw_fmt = ('b58','b32','hex')[bool(opt.base32)+2*bool(opt.hex)]
 
-pw_len = (opt.passwd_len,dfl_len[pw_fmt]/2)[opt.passwd_len in ('h','H')]
+def get_pw_len(pw_fmt,pw_len):
+	return (pw_len,dfl_len[pw_fmt]/2)[pw_len in ('h','H')]
+
+if opt.batch_file:
+	specs = []
+	for line in get_lines_from_file(opt.batch_file,'batch file',trim_comments=True):
+		d = line.split()
+		if len(d) > 3 or (len(d) > 1 and d[1] not in dfl_len):
+			die(2,u"'{}': invalid batch file line".format(line))
+		fmt = d[1] if len(d) > 1 else pw_fmt
+		specs.append((d[0],fmt,get_pw_len(fmt,d[2] if len(d) > 2 else opt.passwd_len)))
+	if not specs:
+		die(2,"'{}': batch file contains no ID strings".format(opt.batch_file))
+else:
+	specs = [(cmd_args.pop(),pw_fmt,get_pw_len(pw_fmt,opt.passwd_len))]
 
-PasswordList(pw_id_str=pw_id_str,pw_len=pw_len,pw_fmt=pw_fmt,chk_params_only=True)
+sf = get_seed_file(cmd_args,1)
+
+for pw_id_str,pw_fmt,pw_len in specs:
+	PasswordList(pw_id_str=pw_id_str,pw_len=pw_len,pw_fmt=pw_fmt,chk_params_only=True)
 do_license_msg()
 
 ss = SeedSource(sf)
 
-al = PasswordList(seed=ss.seed,pw_idxs=pw_idxs,pw_id_str=pw_id_str,pw_len=pw_len,pw_fmt=pw_fmt)
-
-al.format()
-
-if keypress_confirm('Encrypt password list?'):
-	al.encrypt(desc='password list')
-	al.write_to_file(binary=True,desc='encrypted password list')
+def write_passwd_list(al,salt_key=None):
+	if salt_key:
+		al.encrypt(desc='password list',salt_key=salt_key)
+		al.write_to_file(binary=True,desc='encrypted password list')
+	else:
+		al.write_to_file(desc='password list')
+
+if not opt.batch_file:
+	pw_id_str,pw_fmt,pw_len = specs[0]
+	al = PasswordList(seed=ss.seed,pw_idxs=pw_idxs,pw_id_str=pw_id_str,pw_len=pw_len,pw_fmt=pw_fmt)
+	write_passwd_list(al,get_encrypt_key('password list') if keypress_confirm('Encrypt password list?') else None)
+elif opt.combine:
+	lists = list(gen_passwd_lists(ss.seed,specs,pw_idxs,opt.jobs or 1))
+	fn = u'{}-{}.{}'.format(ss.seed.sid,os.path.splitext(os.path.basename(opt.batch_file))[0],combined_ext)
+	def data_f():
+		return (d.encode('utf8') for al in lists for d in al.format_iter())
+	if keypress_confirm('Encrypt password lists?'):
+		data = mmgen_encrypt_iter(data_f,'password lists','')
+		write_data_to_file(fn+'.'+g.mmenc_ext,data,'encrypted password lists',ask_tty=False,binary=True)
+	else:
+		write_data_to_file(fn,data_f(),'password lists',ask_tty=False)
 else:
-	al.write_to_file(desc='password list')
+	# one passphrase and key for all files, each file getting its own IV
+	salt_key = get_encrypt_key('password lists') if keypress_confirm('Encrypt password lists?') else None
+	for al in gen_passwd_lists(ss.seed,specs,pw_idxs,opt.jobs or 1):
+		write_passwd_list(al,salt_key)
@@ -78,6 +78,8 @@ File encryption:
       * Key: Scrypt (user-configurable hash parameters, 32-byte salt)
       * Enc: AES256_CTR, 16-byte rand IV, sha256 hash + 32-byte nonce + data
       * The encrypted file is indistinguishable from random data
+      * The input is read twice, so it must be a regular file: pipes and
+        /dev/stdin are not accepted
 
 {pnm}-specific operations:
   add_label    - add descriptive label for {pnm} address in tracking wallet
@@ -54,6 +54,8 @@ opts_data = lambda: {
                       online signing without an {pnm} seed source. The
                       key-address file is also used to verify {pnm}-to-{cu}
                       mappings, so the user should record its checksum.
+-j, --jobs=        n  Use 'n' worker processes to verify keys in the key-
+                      address file (default: {g.jobs})
 -P, --passwd-file= f  Get {pnm} wallet or {dn} passphrase from file 'f'
 -q, --quiet           Suppress warnings; overwrite files without prompting
 -I, --info            Display information about the transaction and exit
@@ -200,6 +200,20 @@ class MMGenImmutableAttr(object): # Descriptor
 		m = "Atribute '{}' of {} instance cannot be deleted"
 		raise AttributeError(m.format(self.name,type(instance)))
 
+# For attrs that are expensive to compute and might never be used: the value is
+# computed by the instance's 'compute_<name>' method on first access and cached.
+# Assignment allowed only before first access.
+class MMGenLazyAttr(MMGenImmutableAttr): # Descriptor
+
+	def __get__(self,instance,owner):
+		if instance is None: return self
+		if self.name not in instance.__dict__:
+			self.__set__(instance,getattr(instance,'compute_'+self.name)())
+		return instance.__dict__[self.name]
+
+	def set_attr_ok(self,instance):
+		return self.name not in instance.__dict__
+
 # For attrs that might not be present in the data instance
 # Reassignment or deletion allowed if specified
 class MMGenListItemAttr(MMGenImmutableAttr): # Descriptor
@@ -254,13 +268,19 @@ class AddrIdx(int,InitErrors):
 			m = "{!r}: value cannot be converted to address index ({})"
 			return cls.init_fail(m.format(num,e[0]),on_fail)
 
-class AddrIdxList(list,InitErrors,MMGenObject):
+class AddrIdxList(InitErrors,MMGenObject):
+	"""
+	Sorted set of address indexes, stored as a list of merged (beg,end) ranges,
+	so that e.g. '1-1000000' isn't expanded into a list of a million integers
+	"""
 	max_len = 1000000
-	def __init__(self,fmt_str=None,idx_list=None,on_fail='die',sep=','):
-		self.arg_chk(type(self),on_fail)
+	def __new__(cls,fmt_str=None,idx_list=None,on_fail='die',sep=','):
+		cls.arg_chk(cls,on_fail)
 		try:
-			if idx_list:
-				return list.__init__(self,sorted(set(AddrIdx(i,on_fail='raise') for i in idx_list)))
+			if type(idx_list) is cls:
+				return cls.from_ranges(idx_list.ranges)
+			elif idx_list:
+				return cls.from_ranges((i,i) for i in (AddrIdx(i,on_fail='raise') for i in idx_list))
 			elif fmt_str:
 				ret = []
 				for i in (fmt_str.split(sep)):
@@ -268,21 +288,89 @@ class AddrIdxList(list,InitErrors,MMGenObject):
 					if len(j) == 1:
 						idx = AddrIdx(i,on_fail='raise')
 						if not idx: break
-						ret.append(idx)
+						ret.append((idx,idx))
 					elif len(j) == 2:
 						beg = AddrIdx(j[0],on_fail='raise')
 						if not beg: break
 						end = AddrIdx(j[1],on_fail='raise')
 						if not beg: break
 						if end < beg: break
-						ret.extend([AddrIdx(x,on_fail='raise') for x in range(beg,end+1)])
+						ret.append((beg,end))
 					else: break
 				else:
-					return list.__init__(self,sorted(set(ret))) # fell off end of loop - success
+					return cls.from_ranges(ret) # fell off end of loop - success
 				raise ValueError,"{!r}: invalid range".format(i)
+			else:
+				return cls.from_ranges(())
 		except Exception as e:
 			m = "{!r}: value cannot be converted to AddrIdxList ({})"
-			return type(self).init_fail(m.format(idx_list or fmt_str,e[0]),on_fail)
+			return cls.init_fail(m.format(idx_list or fmt_str,e[0]),on_fail)
+
+	@classmethod
+	def from_ranges(cls,ranges):
+		"create from an iterable of inclusive (beg,end) pairs, which may overlap and be unsorted"
+		me = MMGenObject.__new__(cls)
+		me.ranges = []
+		for beg,end in sorted((int(b),int(e)) for b,e in ranges):
+			if me.ranges and beg <= me.ranges[-1][1] + 1:
+				if end > me.ranges[-1][1]:
+					me.ranges[-1] = (me.ranges[-1][0],end)
+			else:
+				me.ranges.append((beg,end))
+		me.offsets,n = [],0 # position of first index of each range
+		for beg,end in me.ranges:
+			me.offsets.append(n)
+			n += end - beg + 1
+		me.len = n
+		return me
+
+	@staticmethod
+	def make_ranges(idxs):
+		"group an iterable of ascending integers into (beg,end) runs of consecutive values"
+		beg = end = None
+		for i in idxs:
+			if end is not None and i == end + 1:
+				end = i
+			else:
+				if end is not None: yield beg,end
+				beg = end = i
+		if end is not None: yield beg,end
+
+	@staticmethod
+	def fmt_ranges(ranges,sep=','):
+		return sep.join((str(b),'{}-{}'.format(b,e))[e>b] for b,e in ranges)
+
+	def __len__(self): return self.len
+
+	def __iter__(self):
+		for beg,end in self.ranges:
+			for i in xrange(beg,end+1):
+				yield i
+
+	def __contains__(self,num):
+		from bisect import bisect_right
+		n = bisect_right(self.ranges,(num,sys.maxint)) - 1
+		return n >= 0 and self.ranges[n][0] <= num <= self.ranges[n][1]
+
+	def __getitem__(self,pos):
+		if type(pos) is slice: # returns a list, like slicing the former list subclass
+			return [self[i] for i in xrange(*pos.indices(self.len))]
+		if pos < 0: pos += self.len
+		if not 0 <= pos < self.len: raise IndexError,'AddrIdxList index out of range'
+		from bisect import bisect_right
+		n = bisect_right(self.offsets,pos) - 1
+		return self.ranges[n][0] + pos - self.offsets[n]
+
+	def __eq__(self,other):
+		if type(other) is type(self): return self.ranges == other.ranges
+		try: return len(other) == self.len and list(self) == list(other)
+		except: return False
+
+	def __ne__(self,other): return not self == other
+
+	def __str__(self): return self.fmt_ranges(self.ranges)
+
+	def __repr__(self): return '{}({!r})'.format(type(self).__name__,str(self))
 
 class BTCAmt(Decimal,Hilite,InitErrors):
 	color = 'yellow'
@@ -366,7 +454,7 @@ class CoinAddr(str,Hilite,InitErrors,MMGenObject):
 		try:
 			assert set(s) <= set(ascii_letters+digits),'contains non-ascii characters'
 			me = str.__new__(cls,s)
-			va = g.proto.verify_addr(s,hex_width=cls.hex_width,return_dict=True)
+			va = g.proto.verify_addr_cached(s,hex_width=cls.hex_width,return_dict=True)
 			assert va,'failed verification'
 			me.addr_fmt = va['format']
 			me.hex = va['hex']
@@ -578,7 +666,7 @@ class PrivKey(str,Hilite,InitErrors,MMGenObject):
 	trunc_ok = False
 
 	compressed = MMGenImmutableAttr('compressed',bool,typeconv=False)
-	wif        = MMGenImmutableAttr('wif',WifKey,typeconv=False)
+	wif        = MMGenLazyAttr('wif',WifKey,typeconv=False)
 
 	# initialize with (priv_bin,compressed), WIF or self
 	def __new__(cls,s=None,compressed=None,wif=None,pubkey_type=None,on_fail='die'):
@@ -605,17 +693,22 @@ class PrivKey(str,Hilite,InitErrors,MMGenObject):
 		try:
 			assert s and type(compressed) == bool and pubkey_type,'Incorrect args for PrivKey()'
 			assert len(s) == cls.width / 2,'Key length must be {}'.format(cls.width/2)
-			me = str.__new__(cls,g.proto.preprocess_key(s.encode('hex'),pubkey_type))
-			me.orig_hex = s.encode('hex') # save the non-preprocessed key
+			orig_hex = s.encode('hex')
+			me = str.__new__(cls,g.proto.preprocess_key(orig_hex,pubkey_type))
+			me.orig_hex = orig_hex # save the non-preprocessed key
 			me.compressed = compressed
 			me.pubkey_type = pubkey_type
-			if pubkey_type != 'password': # skip WIF creation for passwds
-				me.wif = WifKey(g.proto.hex2wif(me,pubkey_type,compressed),on_fail='raise')
-			return me
+			return me # WIF is created on first access
 		except Exception as e:
 			fs = "Key={!r}\nCompressed={}\nValue pair cannot be converted to PrivKey\n({})"
 			return cls.init_fail(fs.format(s,compressed,e),on_fail)
 
+	def compute_wif(self):
+		if self.pubkey_type == 'password': # no WIF for passwds
+			raise AttributeError('Password keys have no WIF')
+		from mmgen.globalvars import g
+		return WifKey(g.proto.hex2wif(self,self.pubkey_type,self.compressed),on_fail='raise')
+
 
 class AddrListID(str,Hilite,InitErrors,MMGenObject):
 	width = 10
@@ -38,12 +38,16 @@ def die_on_incompatible_opts(incompat_list):
 def fmt_opt(o): return '--' + o.replace('_','-')
 
 def _show_hash_presets():
-	fs = '  {:<7} {:<6} {:<3}  {}'
+	from mmgen.crypto import load_hash_preset_bench
+	bench = load_hash_preset_bench() or {}
+	fs = '  {:<7} {:<6} {:<3}  {:<3} {}'
 	msg('Available parameters for scrypt.hash():')
-	msg(fs.format('Preset','N','r','p'))
+	msg(fs.format('Preset','N','r','p',('','Unlock time')[bool(bench)]))
 	for i in sorted(g.hash_presets.keys()):
-		msg(fs.format("'%s'" % i, *g.hash_presets[i]))
+		t = '{:.2f}s'.format(bench[i][0]) if i in bench else ''
+		msg(fs.format("'%s'" % i, *g.hash_presets[i]+[t]))
 	msg('N = memory usage (power of two), p = iterations (rounds)')
+	if bench: msg("Unlock times are from the last 'mmgen-tool hash_preset_bench' run")
 
 def opt_preproc_debug(short_opts,long_opts,skipped_opts,uopts,args):
 	d = (
@@ -265,6 +269,12 @@ def init(opts_f,add_opts=[],opt_filter=None):
 #	g.proto is set, so we can set g.data_dir
 	g.data_dir = os.path.normpath(os.path.join(g.data_dir_root,g.proto.data_subdir))
 
+	# Pick the default hash preset from saved benchmark results, if requested
+	if g.hash_preset_target_secs and getattr(opt,'hash_preset',None) == None:
+		from mmgen.crypto import load_hash_preset_bench,recommend_hash_preset
+		hp = recommend_hash_preset(load_hash_preset_bench() or {},g.hash_preset_target_secs)
+		if hp: g.hash_preset = hp
+
 	# If user opt is set, convert its type based on value in mmgen.globalvars (g)
 	# If unset, set it to default value in mmgen.globalvars (g)
 	setattr(opt,'set_by_user',[])
@@ -468,6 +478,9 @@ def check_opts(usr_opts):       # Returns false if any check fails
 		elif key == 'key_generator':
 			if not opt_compares(val,'<=',len(g.key_generators),desc): return False
 			if not opt_compares(val,'>',0,desc): return False
+		elif key == 'jobs':
+			if not opt_is_int(val,desc): return False
+			if not opt_compares(val,'>',0,desc): return False
 		elif key == 'coin':
 			from mmgen.protocol import CoinProtocol
 			if not opt_is_in_list(val.lower(),CoinProtocol.coins.keys(),'coin'): return False
@@ -21,16 +21,22 @@ protocol.py: Coin protocol functions, classes and methods
 """
 
 import sys,os,hashlib
-from binascii import unhexlify
+from binascii import hexlify,unhexlify
 from mmgen.util import msg,pmsg,Msg,pdie
 from mmgen.obj import MMGenObject,BTCAmt,LTCAmt,BCHAmt,B2XAmt
 from mmgen.globalvars import g
 
 def hash160(hexnum): # take hex, return hex - OP_HASH160
-	return hashlib.new('ripemd160',hashlib.sha256(unhexlify(hexnum)).digest()).hexdigest()
+	return hexlify(hash160_bin(unhexlify(hexnum)))
 
 def hash256(hexnum): # take hex, return hex - OP_HASH256
-	return hashlib.sha256(hashlib.sha256(unhexlify(hexnum)).digest()).hexdigest()
+	return hexlify(hash256_bin(unhexlify(hexnum)))
+
+def hash160_bin(data): # take bytes, return bytes
+	return hashlib.new('ripemd160',hashlib.sha256(data).digest()).digest()
+
+def hash256_bin(data): # take bytes, return bytes
+	return hashlib.sha256(hashlib.sha256(data).digest()).digest()
 
 # From en.bitcoin.it:
 #  The Base58 encoding used is home made, and has some differences.
@@ -39,21 +45,46 @@ def hash256(hexnum): # take hex, return hex - OP_HASH256
 # The 'zero address':
 # 1111111111111111111114oLvT2 (pubkeyhash = '\0'*20)
 _b58a='123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+# all two-digit combinations, for conversion two digits at a time
+_b58a2 = tuple(a+b for a in _b58a for b in _b58a)
+_b58d2 = dict((s,i) for i,s in enumerate(_b58a2))
+
+# optional C accelerator, built by setup.py
+try:
+	from mmgen.b58 import encode as _b58encode_c,decode as _b58decode_c
+except:
+	_b58encode_c = None
 
 def _numtob58(num):
 	ret = []
 	while num:
-		ret.append(_b58a[num % 58])
-		num /= 58
-	return ''.join(ret)[::-1]
+		num,r = divmod(num,3364)
+		ret.append(_b58a2[r])
+	return ''.join(reversed(ret)).lstrip('1')
 
 def _b58tonum(b58num):
-	if [i for i in b58num if not i in _b58a]:
+	if _b58encode_c:
+		return int(hexlify(_b58decode_c(b58num)) or '0',16)
+	if len(b58num) % 2: b58num = '1' + b58num
+	num = 0
+	try:
+		for i in range(0,len(b58num),2):
+			num = num * 3364 + _b58d2[b58num[i:i+2]]
+	except KeyError:
 		raise ValueError,'_b58tonum(): invalid b58 value'
-	return sum(_b58a.index(n) * (58**i) for i,n in enumerate(list(b58num[::-1])))
+	return num
+
+# Encode numeric value of 'data'.  Leading zero bytes are ignored, as with _numtob58().
+def _b58encode_bin(data):
+	if _b58encode_c:
+		return _b58encode_c(data)
+	return _numtob58(int(hexlify(data) or '0',16))
 
 def _b58chk_encode(hexstr):
-	return _numtob58(int(hexstr+hash256(hexstr)[:8],16))
+	return _b58chk_encode_bin(unhexlify(hexstr))
+
+def _b58chk_encode_bin(data):
+	return _b58encode_bin(data+hash256_bin(data)[:4])
 
 def _b58chk_decode(s):
 	hexstr = '{:x}'.format(_b58tonum(s))
@@ -61,6 +92,37 @@ def _b58chk_decode(s):
 		return hexstr[:-8]
 	raise ValueError,'_b58chk_decode(): checksum incorrect'
 
+class AddrCache(object):
+	"""
+	Bounded cache of address verification results with approximate LRU eviction.
+	Entries go into the current generation, which replaces the previous one when
+	full.  Entries found in the previous generation are moved to the current one,
+	so only those not used for a full generation are discarded.
+	"""
+	def __init__(self,maxsize):
+		self.gen_size = max(maxsize/2,1)
+		self.cur,self.prev = {},{}
+		self.hits = self.misses = 0
+
+	def get(self,key):
+		if key in self.cur:
+			self.hits += 1
+			return self.cur[key]
+		if key in self.prev:
+			self.hits += 1
+			val = self.prev.pop(key)
+			self.add(key,val)
+			return val
+		self.misses += 1
+		return None
+
+	def add(self,key,val):
+		if len(self.cur) >= self.gen_size:
+			self.cur,self.prev = {},self.cur
+		self.cur[key] = val
+
+addr_cache = AddrCache(g.addr_cache_size)
+
 # chainparams.cpp
 class BitcoinProtocol(MMGenObject):
 	name            = 'bitcoin'
@@ -150,24 +212,51 @@ class BitcoinProtocol(MMGenObject):
 		if g.debug: Msg("Invalid address '{}'".format(addr))
 		return False
 
+	@classmethod
+	def verify_addr_cached(cls,addr,hex_width,return_dict=False):
+		"verify_addr() with results memoized in 'addr_cache', keyed by protocol and address"
+		key = (cls,addr,hex_width)
+		ret = addr_cache.get(key)
+		if ret is None:
+			ret = cls.verify_addr(addr,hex_width,return_dict=True)
+			if not (ret == False or type(ret) == dict): # no caching for non-standard return values
+				return ret
+			addr_cache.add(key,ret and (ret['hex'],ret['format']))
+		elif ret:
+			ret = { 'hex': ret[0], 'format': ret[1], 'width': cls.addr_width }
+		return ret if return_dict else bool(ret)
+
 	@classmethod
 	def pubhash2addr(cls,pubkey_hash,p2sh):
 		assert len(pubkey_hash) == 40,'{}: invalid length for pubkey hash'.format(len(pubkey_hash))
-		s = cls.addr_ver_num[('p2pkh','p2sh')[p2sh]][0] + pubkey_hash
-		lzeroes = (len(s) - len(s.lstrip('0'))) / 2 # non-zero only for ver num '00' (BTC p2pkh)
-		return ('1' * lzeroes) + _b58chk_encode(s)
+		return cls.pubhash2addr_bin(unhexlify(pubkey_hash),p2sh)
+
+	@classmethod
+	def pubhash2addr_bin(cls,pubkey_hash,p2sh):
+		assert len(pubkey_hash) == 20,'{}: invalid length for pubkey hash'.format(len(pubkey_hash))
+		s = unhexlify(cls.addr_ver_num[('p2pkh','p2sh')[p2sh]][0]) + pubkey_hash
+		lzeroes = len(s) - len(s.lstrip('\0')) # non-zero only for ver num '00' (BTC p2pkh)
+		return ('1' * lzeroes) + _b58chk_encode_bin(s)
 
 	# Segwit:
 	@classmethod
 	def pubhex2redeem_script(cls,pubhex):
+		return hexlify(cls.pubbin2redeem_script(unhexlify(pubhex)))
+
+	@classmethod
+	def pubhex2segwitaddr(cls,pubhex):
+		return cls.pubbin2segwitaddr(unhexlify(pubhex))
+
+	@classmethod
+	def pubbin2redeem_script(cls,pubkey):
 		# https://bitcoincore.org/en/segwit_wallet_dev/
 		# The P2SH redeemScript is always 22 bytes. It starts with a OP_0, followed
 		# by a canonical push of the keyhash (i.e. 0x0014{20-byte keyhash})
-		return '0014' + hash160(pubhex)
+		return '\x00\x14' + hash160_bin(pubkey)
 
 	@classmethod
-	def pubhex2segwitaddr(cls,pubhex):
-		return cls.pubhash2addr(hash160(cls.pubhex2redeem_script(pubhex)),p2sh=True)
+	def pubbin2segwitaddr(cls,pubkey):
+		return cls.pubhash2addr_bin(hash160_bin(cls.pubbin2redeem_script(pubkey)),p2sh=True)
 
 class BitcoinTestnetProtocol(BitcoinProtocol):
 	addr_ver_num         = { 'p2pkh': ('6f',('m','n')), 'p2sh':  ('c4','2') }
@@ -196,6 +285,10 @@ class BitcoinCashProtocol(BitcoinProtocol):
 	def pubhex2redeem_script(cls,pubhex): raise NotImplementedError
 	@classmethod
 	def pubhex2segwitaddr(cls,pubhex):    raise NotImplementedError
+	@classmethod
+	def pubbin2redeem_script(cls,pubkey): raise NotImplementedError
+	@classmethod
+	def pubbin2segwitaddr(cls,pubkey):    raise NotImplementedError
 
 class BitcoinCashTestnetProtocol(BitcoinCashProtocol):
 	rpc_port      = 18442
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+#
+# mmgen = Multi-Mode GENerator, command-line Bitcoin cold storage solution
+# Copyright (C)2013-2017 Philemon <mmgen-py@yandex.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+secp256k1_native.py:  Native Python secp256k1 public key generation for the MMGen suite
+
+Points are added in Jacobian coordinates, with a fixed-base window table for the
+generator G, so that a scalar multiplication takes at most 32 point additions
+and no doublings.  The table is computed on first use and kept in memory only.
+"""
+
+from binascii import unhexlify
+
+# secp256k1, http://www.secg.org/sec2-v2.pdf
+P  = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2FL
+N  = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141L
+Gx = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798L
+Gy = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8L
+
+W = 8            # window width in bits
+WINDOWS = 256/W  # table[i][j] = j * 2**(W*i) * G, j = 1..2**W-1
+
+INF = (0,1,0) # point at infinity: Z == 0
+
+def inv(a):
+	return pow(a,P-2,P)
+
+def batch_inv(vals):
+	"invert all elements of 'vals' (none of which may be zero) with a single field inversion"
+	acc,prods = 1,[]
+	for v in vals:
+		prods.append(acc)
+		acc = acc * v % P
+	acc,ret = inv(acc),[None] * len(vals)
+	for i in range(len(vals)-1,-1,-1):
+		ret[i] = acc * prods[i] % P
+		acc = acc * vals[i] % P
+	return ret
+
+def jacobian_double(pt):
+	X1,Y1,Z1 = pt
+	if not Z1 or not Y1: return INF
+	YY = Y1 * Y1 % P
+	S = 4 * X1 * YY % P
+	M = 3 * X1 * X1 % P # curve parameter a is zero
+	X3 = (M * M - 2 * S) % P
+	return X3, (M * (S - X3) - 8 * YY * YY) % P, 2 * Y1 * Z1 % P
+
+def jacobian_add_affine(pt,q):
+	"add affine point 'q' to Jacobian point 'pt'"
+	X1,Y1,Z1 = pt
+	if not Z1: return q[0],q[1],1
+	Z1Z1 = Z1 * Z1 % P
+	H = (q[0] * Z1Z1 - X1) % P
+	R = (q[1] * Z1 * Z1Z1 - Y1) % P
+	if not H:
+		return jacobian_double(pt) if not R else INF
+	HH = H * H % P
+	HHH = H * HH % P
+	V = X1 * HH % P
+	X3 = (R * R - HHH - 2 * V) % P
+	return X3, (R * (V - X3) - Y1 * HHH) % P, Z1 * H % P
+
+def to_affine(pts):
+	"convert a list of finite Jacobian points to affine coordinates"
+	ret = []
+	for (X,Y,Z),zi in zip(pts,batch_inv([pt[2] for pt in pts])):
+		zi2 = zi * zi % P
+		ret.append((X * zi2 % P, Y * zi2 * zi % P))
+	return ret
+
+def make_table():
+	table,base = [],(Gx,Gy)
+	for i in range(WINDOWS):
+		pts = [(base[0],base[1],1)]
+		for j in range(2**W - 2):
+			pts.append(jacobian_add_affine(pts[-1],base))
+		dbl = pts[-1] # (2**W - 1) * base
+		pts = to_affine(pts)
+		table.append([None] + pts)
+		base = to_affine([jacobian_add_affine(dbl,base)])[0]
+	return table
+
+_table = None
+
+def get_table():
+	"""
+	Return the table, computing it on first use.  It's not cached on disk, as a
+	replaced table file would silently yield wrong public keys.
+	"""
+	global _table
+	if not _table: _table = make_table()
+	return _table
+
+def privnum2jacobian(k,table):
+	assert 0 < k < N,'private key out of range'
+	pt,mask = INF,2**W - 1
+	for row in table:
+		if k & mask: pt = jacobian_add_affine(pt,row[k & mask])
+		k >>= W
+	return pt
+
+def privnums2points(nums):
+	"return the public key points for a list of private key numbers as affine coordinates"
+	table = get_table()
+	return to_affine([privnum2jacobian(k,table) for k in nums])
+
+def serialize_point(pt,compressed):
+	if compressed: # even Y: 0x02, odd Y: 0x03
+		return ('\x02','\x03')[pt[1] & 1] + unhexlify('{:064x}'.format(pt[0]))
+	else:
+		return '\x04' + unhexlify('{:064x}{:064x}'.format(*pt))
@@ -256,6 +256,8 @@ an empty passphrase, just hit ENTER twice.
 			m,
 			hp
 		)
+		m = hash_preset_times_msg()
+		if m: msg(m)
 		while True:
 			ret = my_raw_input(p)
 			if ret:
@@ -448,7 +450,7 @@ class Mnemonic (SeedSourceUnenc):
 			return False
 
 		for n,w in enumerate(mn,1):
-			if w not in baseconv.digits[self.wl_id]:
+			if w not in baseconv.digit_idx(self.wl_id):
 				msg('Invalid mnemonic: word #%s is not in the wordlist' % n)
 				return False
 
@@ -712,6 +714,12 @@ class Wallet (SeedSourceEnc):
 
 	def _decrypt(self):
 		d = self.ssdata
+		if self.op == 'old' and g.agent_sock:
+			from mmgen.agent import get_seed_from_agent
+			seed = get_seed_from_agent(d.seed_id)
+			if seed:
+				self.seed = seed
+				return True
 		# Needed for multiple transactions with {}-txsign
 		suf = ('',os.path.basename(self.infile.name))[bool(opt.quiet)]
 		self._get_passphrase(desc_suf=suf)
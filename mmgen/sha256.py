@@ -29,6 +29,12 @@ sha256.py: custom sha256 implementation for Zcash
 # and here:
 #   https://github.com/howardwu/zaddr
 
+# optional C implementation of the compression function, built by setup.py
+try:
+	from mmgen.sha256compress import compress as _compress_c
+except:
+	_compress_c = None
+
 class Sha256(object):
 
 	def initConstants():
@@ -57,6 +63,10 @@ class Sha256(object):
 	def __init__(self,message,preprocess=True):
 		self.H = [0x6A09E667,0xBB67AE85,0x3C6EF372,0xA54FF53A,0x510E527F,0x9B05688C,0x1F83D9AB,0x5BE0CD19]
 		self.M = message
+		if not preprocess and _compress_c:
+			from struct import unpack
+			self.H = list(unpack('>8I',_compress_c(''.join(message))))
+			return
 		self.W = [0] * 64
 		(self.bytesToWords,self.preprocessBlock)[preprocess]()
 #		self.initConstants()
@@ -81,7 +91,8 @@ class Sha256(object):
 
 	def wordsToBytes(self):
 		assert type(self.M) == list and len(self.M) == 8
-		self.M = ''.join([chr((self.M[b >> 5] >> (24 - b % 32)) & 0xff) for b in range(0,len(self.M)*32,8)])
+		from struct import pack
+		self.M = pack('>8I',*self.M)
 
 	def preprocessBlock(self):
 		def lshift(a,b): return (a << b) & 0xffffffff
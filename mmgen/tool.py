@@ -88,11 +88,12 @@ cmd_data = OrderedDict([
 	('Addrfile_chksum', ['<{} addr file> [str]'.format(pnm),"mmtype [str='']"]),
 	('Keyaddrfile_chksum', ['<{} addr file> [str]'.format(pnm),"mmtype [str='']"]),
 	('Passwdfile_chksum', ['<{} password file> [str]'.format(pnm)]),
-	('Find_incog_data', ['<file or device name> [str]','<Incog ID> [str]','keep_searching [bool=False]']),
+	('Find_incog_data', ['<file or device name> [str]','<Incog ID(s), comma-separated> [str]','keep_searching [bool=False]','jobs [int=0]','resume [bool=False]']),
 
 	('Encrypt',      ['<infile> [str]',"outfile [str='']","hash_preset [str='']"]),
 	('Decrypt',      ['<infile> [str]',"outfile [str='']","hash_preset [str='']"]),
 	('Bytespec',     ['<bytespec> [str]']),
+	('Hash_preset_bench',['target_secs [float=0]','max_secs [float=60]','save [bool=True]']),
 
 	('Keyaddrlist2monerowallet',['<{} XMR key-address file> [str]'.format(pnm),'blockheight [int=(current height)]']),
 ])
@@ -369,18 +370,21 @@ def Hash256(s,file_input=False,hex_input=False):
 	else:           b = s
 	Msg(sha256(sha256(b).digest()).hexdigest())
 
+# Encrypt and Decrypt stream the data in chunks, so file size isn't limited by memory
 def Encrypt(infile,outfile='',hash_preset=''):
-	data = get_data_from_file(infile,'data for encryption',binary=True)
-	enc_d = mmgen_encrypt(data,'user data',hash_preset)
+	check_infile(infile)
+	qmsg("Getting data for encryption from file '{}'".format(infile))
+	enc_d = mmgen_encrypt_iter(lambda: get_data_from_file_iter(infile,None,binary=True),'user data',hash_preset)
 	if not outfile:
 		outfile = '{}.{}'.format(os.path.basename(infile),g.mmenc_ext)
 
 	write_data_to_file(outfile,enc_d,'encrypted data',binary=True)
 
 def Decrypt(infile,outfile='',hash_preset=''):
-	enc_d = get_data_from_file(infile,'encrypted data',binary=True)
+	check_infile(infile)
+	qmsg("Getting encrypted data from file '{}'".format(infile))
 	while True:
-		dec_d = mmgen_decrypt(enc_d,'user data',hash_preset)
+		dec_d = mmgen_decrypt_iter(lambda: get_data_from_file_iter(infile,None,binary=True),'user data',hash_preset)
 		if dec_d: break
 		msg('Trying again...')
 
@@ -391,30 +395,145 @@ def Decrypt(infile,outfile='',hash_preset=''):
 
 	write_data_to_file(outfile,dec_d,'decrypted data',binary=True)
 
-def Find_incog_data(filename,iv_id,keep_searching=False):
-	ivsize,bsize,mod = g.aesctr_iv_len,4096,4096*8
-	n,carry = 0,' '*ivsize
-	flgs = os.O_RDONLY|os.O_BINARY if g.platform == 'win' else os.O_RDONLY
-	f = os.open(filename,flgs)
-	for ch in iv_id:
-		if ch not in '0123456789ABCDEF':
-			die(2,"'{}': invalid Incog ID".format(iv_id))
-	while True:
-		d = os.read(f,bsize)
-		if not d: break
-		d = carry + d
-		for i in range(bsize):
-			if sha256(d[i:i+ivsize]).hexdigest()[:8].upper() == iv_id:
-				if n+i < ivsize: continue
-				msg('\rIncog data for ID {} found at offset {}'.format(iv_id,n+i-ivsize))
-				if not keep_searching: sys.exit(0)
-		carry = d[len(d)-ivsize:]
-		n += bsize
-		if not n % mod:
-			msg_r('\rSearched: {} bytes'.format(n))
+# optional C search function, built by setup.py
+try:
+	from mmgen.sha256compress import scan as _incog_scan_c
+except:
+	_incog_scan_c = None
+
+def _incog_scan_py(d,ivsize,prefixes):
+	p = set(prefixes[i:i+4] for i in range(0,len(prefixes),4))
+	return [i for i in xrange(len(d)-ivsize+1) if sha256(d[i:i+ivsize]).digest()[:4] in p]
+
+_incog_seg_len = 1<<22
+
+def _incog_scan(fn,beg,end,prefixes,seg_len=_incog_seg_len):
+	"""
+	Search IV start offsets 'beg' to 'end' of file 'fn' for IVs whose hash begins
+	with one of the 4-byte 'prefixes', mapping the file one segment at a time.
+	Yields the end of each segment with the offsets found in it.
+	"""
+	import mmap
+	ivsize,f = g.aesctr_iv_len,os.open(fn,os.O_RDONLY|getattr(os,'O_BINARY',0))
+	scan_f = _incog_scan_c or _incog_scan_py
+	try:
+		while beg < end:
+			seg_end = min(beg+seg_len,end)
+			moff = beg - beg % mmap.ALLOCATIONGRANULARITY
+			m = mmap.mmap(f,seg_end+ivsize-1-moff,access=mmap.ACCESS_READ,offset=moff)
+			found = [beg+i for i in scan_f(buffer(m,beg-moff),ivsize,prefixes)]
+			m.close()
+			yield seg_end,found
+			beg = seg_end
+	finally:
+		os.close(f)
+
+def _incog_scan_worker(conn,fn,beg,end,prefixes):
+	try:
+		for ret in _incog_scan(fn,beg,end,prefixes): conn.send(ret)
+	except KeyboardInterrupt:
+		pass
+	conn.close()
+
+def Find_incog_data(filename,iv_id,keep_searching=False,jobs=0,resume=False):
+	ivsize = g.aesctr_iv_len
+	ids = sorted(set(i.upper() for i in iv_id.split(',')))
+	for i in ids:
+		if len(i) != 8 or i.strip('0123456789ABCDEF'):
+			die(2,"'{}': invalid Incog ID".format(i))
+	f = os.open(filename,os.O_RDONLY|getattr(os,'O_BINARY',0))
+	size = os.lseek(f,0,os.SEEK_END) # os.path.getsize() doesn't work with devices
+
+	def get_id(offset):
+		os.lseek(f,offset,os.SEEK_SET)
+		return sha256(os.read(f,ivsize)).hexdigest()[:8].upper()
+
+	# Progress is saved so that an interrupted scan may be resumed with 'resume=1'
+	import json
+	fn = os.path.abspath(filename)
+	state_fn = os.path.join(g.data_dir_root,'find_incog-{}.json'.format(
+					sha256(json.dumps([fn,size,ids])).hexdigest()[:8]))
+	def save_state():
+		check_or_create_dir(g.data_dir_root)
+		with open(state_fn,'wb') as sf:
+			json.dump({'file':fn,'size':size,'ids':ids,'shards':shards,'found':found},sf)
+
+	nstarts = max(size - ivsize + 1,0) # number of possible IV offsets
+	if resume and os.path.exists(state_fn):
+		with open(state_fn,'rb') as sf: d = json.load(sf)
+		shards,found = d['shards'],d['found']
+		msg('Resuming scan of {} at {} bytes'.format(fn,nstarts-sum(e-b for b,e in shards)))
+		for i,o in found: msg('Incog data for ID {} found at offset {}'.format(i,o))
+	else:
+		if resume: msg('No saved scan found, starting from the beginning')
+		if g.platform != 'linux': jobs = 1 # fork() is unavailable on Windows
+		from multiprocessing import cpu_count
+		jobs = max(1,min(jobs or cpu_count(),nstarts / _incog_seg_len)) # at least one segment per job
+		n = (nstarts + jobs - 1) / jobs
+		shards,found = [[i*n,min((i+1)*n,nstarts)] for i in range(jobs)],[]
+
+	def all_found(): return not keep_searching and set(i for i,o in found) >= set(ids)
+
+	def gen_results(): # yields (shard number,scanned up to,offsets found)
+		prefixes = ''.join(binascii.unhexlify(i) for i in ids)
+		todo = [(n,b,e) for n,(b,e) in enumerate(shards) if b < e]
+		if len(todo) == 1:
+			for pos,offsets in _incog_scan(fn,todo[0][1],todo[0][2],prefixes):
+				yield todo[0][0],pos,offsets
+			return
+		import multiprocessing as mp,select
+		readers,procs = {},[]
+		for n,b,e in todo:
+			r,w = mp.Pipe(duplex=False)
+			p = mp.Process(target=_incog_scan_worker,args=(w,fn,b,e,prefixes))
+			p.daemon = True
+			p.start()
+			w.close()
+			readers[r] = n
+			procs.append(p)
+		try:
+			while readers:
+				for r in select.select(readers.keys(),[],[])[0]:
+					try:
+						pos,offsets = r.recv()
+					except EOFError:
+						del readers[r]
+					else:
+						yield readers[r],pos,offsets
+		finally:
+			for p in procs: p.terminate()
+
+	import time
+	t_start = t_saved = t_shown = time.time()
+	start_left = sum(e-b for b,e in shards)
+	try:
+		for n,pos,offsets in ([] if all_found() else gen_results()):
+			shards[n][0] = pos
+			for o in offsets:
+				found.append([get_id(o),o])
+				msg('\rIncog data for ID {} found at offset {}'.format(*found[-1]))
+			if all_found(): break
+			now = time.time()
+			if now - t_shown >= 1:
+				left = sum(e-b for b,e in shards)
+				rate = (start_left - left) / (now - t_start)
+				msg_r('\rSearched: {} of {} bytes ({:.1f}%), {:.2f} MB/s, ETA {}  '.format(
+					nstarts-left,nstarts,100.0*(nstarts-left)/(nstarts or 1),rate/1e6,
+					secs_to_hms(int(left/rate)) if rate else '--:--:--'))
+				t_shown = now
+			if now - t_saved >= 10:
+				save_state()
+				t_saved = now
+	except KeyboardInterrupt:
+		save_state()
+		die(1,'\nScan interrupted.  Rerun with resume=1 to continue')
+	finally:
+		os.close(f)
 
 	msg('')
-	os.close(f)
+	if os.path.exists(state_fn): os.unlink(state_fn)
+	missing = set(ids) - set(i for i,o in found)
+	if missing: msg('Incog data for ID{} {} not found'.format(suf(missing),' '.join(sorted(missing))))
 
 def Rand2file(outfile,nbytes,threads=4,silent=False):
 	nbytes = parse_nbytes(nbytes)
@@ -475,6 +594,20 @@ def Rand2file(outfile,nbytes,threads=4,silent=False):
 
 def Bytespec(s): Msg(str(parse_nbytes(s)))
 
+def Hash_preset_bench(target_secs=0,max_secs=60,save=True):
+	bench = bench_hash_presets(max_secs)
+	fs = '{:<7} {:<3} {:<3} {:<3} {:>9} {:>9}'
+	Msg(fs.format('Preset','N','r','p','Time','Memory'))
+	for hp in sorted(bench,key=int):
+		secs,mem = bench[hp]
+		Msg(fs.format("'{}'".format(hp),*g.hash_presets[hp]+['{:.3f}s'.format(secs),'{:.1f}M'.format(mem/1048576.0)]))
+	if save:
+		qmsg("Benchmark results saved to '{}'".format(save_hash_preset_bench(bench)))
+	if target_secs:
+		hp = recommend_hash_preset(bench,target_secs)
+		if hp: Msg("Strongest hash preset for a {}s unlock time: '{}'".format(target_secs,hp))
+		else:  Msg('No hash preset is fast enough for a {}s unlock time'.format(target_secs))
+
 def Keyaddrlist2monerowallet(infile,blockheight=None):
 	import pexpect
 
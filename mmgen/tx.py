@@ -600,6 +600,8 @@ class MMGenTX(MMGenObject):
 			kg = KeyGenerator('std')
 			ag = AddrGenerator('segwit')
 			keydict = MMGenDict([(d.addr,d.sec) for d in keys])
+			sw_addrs = [d.addr for d in self.inputs if d.mmid and d.mmid.mmtype == 'S']
+			pubkeys = dict(zip(sw_addrs,kg.to_pubhex_batch([keydict[a] for a in sw_addrs])))
 
 		sig_data = []
 		for d in self.inputs:
@@ -607,7 +609,7 @@ class MMGenTX(MMGenObject):
 			e['amount'] = e['amt']
 			del e['amt']
 			if d.mmid and d.mmid.mmtype == 'S':
-				e['redeemScript'] = ag.to_segwit_redeem_script(kg.to_pubhex(keydict[d.addr]))
+				e['redeemScript'] = ag.to_segwit_redeem_script(pubkeys[d.addr])
 			sig_data.append(e)
 
 		msg_r('Signing transaction{}...'.format(tx_num_str))
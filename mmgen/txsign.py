@@ -45,6 +45,13 @@ def get_seed_for_seed_id(sid,infiles,saved_seeds):
 	if sid in saved_seeds:
 		return saved_seeds[sid]
 
+	if g.agent_sock:
+		from mmgen.agent import get_seed_from_agent
+		seed = get_seed_from_agent(sid)
+		if seed:
+			saved_seeds[sid] = seed
+			return seed
+
 	while True:
 		if infiles:
 			ss = SeedSource(infiles.pop(0),ignore_in_fmt=True)
@@ -82,18 +89,20 @@ def add_keys(tx,src,infiles=None,saved_seeds=None,keyaddr_list=None):
 	qmsg('Checking {} -> {} address mappings for {} (from {})'.format(pnm,g.coin,src,desc))
 	d = MMGenList([keyaddr_list]) if keyaddr_list else \
 		generate_kals_for_mmgen_addrs(need_keys,infiles,saved_seeds)
+	kals = {}
+	for kal in d: kals.setdefault(kal.al_id,[]).append(kal)
 	new_keys = []
 	for e in need_keys:
-		for kal in d:
-			for f in kal.data:
+		for kal in kals.get(e.mmid.al_id,[]):
+			f = kal.entry(e.mmid.idx)
+			if not f: continue
+			if f.addr == e.addr:
+				e.have_wif = True
+				if src == 'inputs':
+					new_keys.append(f)
+			else:
 				mmid = '{}:{}'.format(kal.al_id,f.idx)
-				if mmid == e.mmid:
-					if f.addr == e.addr:
-						e.have_wif = True
-						if src == 'inputs':
-							new_keys.append(f)
-					else:
-						die(3,wmsg['mapping_error'].format(m1,mmid,f.addr,'tx file:',e.mmid,e.addr))
+				die(3,wmsg['mapping_error'].format(m1,mmid,f.addr,'tx file:',e.mmid,e.addr))
 	if new_keys:
 		vmsg('Added %s wif key%s from %s' % (len(new_keys),suf(new_keys,'s'),desc))
 	return new_keys
@@ -114,7 +123,7 @@ def get_seed_files(opt,args):
 	wf = find_file_in_dir(Wallet,g.data_dir) # Make this the first encrypted ss in the list
 	if wf: ret.append(wf)
 	ret += _pop_and_return(args,e.get_extensions())
-	if not (ret or opt.mmgen_keys_from_file or opt.keys_from_file): # or opt.use_wallet_dat
+	if not (ret or opt.mmgen_keys_from_file or opt.keys_from_file or g.agent_sock): # or opt.use_wallet_dat
 		die(1,'You must specify a seed or key source!')
 	return ret
 
@@ -125,7 +134,7 @@ def get_keyaddrlist(opt):
 
 def get_keylist(opt):
 	if opt.keys_from_file:
-		l = get_lines_from_file(opt.keys_from_file,'key-address data',trim_comments=True)
+		l = get_lines_from_file_iter(opt.keys_from_file,'key-address data',trim_comments=True)
 		kal = KeyAddrList(keylist=[m.split()[0] for m in l]) # accept coin daemon wallet dumps
 		kal.generate_addrs_from_keys()
 		return kal
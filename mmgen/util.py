@@ -164,8 +164,14 @@ def remove_extension(f,e):
 	return (f,a)[len(b)>1 and b[1:]==e]
 
 def make_chksum_N(s,nchars,sep=False):
+	return make_chksum_N_iter([s],nchars,sep=sep)
+
+# for data supplied as an iterable of strings
+def make_chksum_N_iter(chunks,nchars,sep=False):
 	if nchars%4 or not (4 <= nchars <= 64): return False
-	s = sha256(sha256(s).digest()).hexdigest().upper()
+	h = sha256()
+	for s in chunks: h.update(s)
+	s = sha256(h.digest()).hexdigest().upper()
 	sep = ('',' ')[bool(sep)]
 	return sep.join([s[i*4:i*4+4] for i in range(nchars/4)])
 
@@ -246,18 +252,34 @@ def is_ascii(s,enc='ascii'):
 
 def is_utf8(s): return is_ascii(s,enc='utf8')
 
+class WordlistDict(dict):
+	"""
+	Dict of baseconv digits.  The mnemonic wordlists are large, so they're imported,
+	and their checksums verified, only on first access.
+	"""
+	wl_modules = { 'electrum': 'mmgen.mn_electrum', 'tirosh': 'mmgen.mn_tirosh' }
+
+	def __contains__(self,wl_id):
+		return dict.__contains__(self,wl_id) or wl_id in self.wl_modules
+
+	def __missing__(self,wl_id):
+		words = __import__(self.wl_modules[wl_id],fromlist=['words']).words.split()
+		wl = tuple(words[:baseconv.mn_base])
+		chk = sha256(' '.join(wl)).hexdigest()[:8]
+		assert chk == baseconv.wl_chksums[wl_id],"'{}': wordlist checksum mismatch".format(wl_id)
+		self[wl_id] = wl
+		return wl
+
 class baseconv(object):
 
 	mn_base = 1626 # tirosh list is 1633 words long!
-	digits = {
-		'electrum': tuple(__import__('mmgen.mn_electrum',fromlist=['words']).words.split()),
-		'tirosh': tuple(__import__('mmgen.mn_tirosh',fromlist=['words']).words.split()[:mn_base]),
+	digits = WordlistDict({
 		'b58': tuple('123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'),
 		'b32': tuple('ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'),
 		'b16': tuple('0123456789abcdef'),
 		'b10': tuple('0123456789'),
 		'b8':  tuple('01234567'),
-	}
+	})
 	wl_chksums = {
 		'electrum': '5ca31424',
 		'tirosh':   '48f05e1f', # tirosh truncated to mn_base (1626)
@@ -265,6 +287,49 @@ class baseconv(object):
 	}
 	b58pad_lens =     [(16,22), (24,33), (32,44)]
 	b58pad_lens_rev = [(v,k) for k,v in b58pad_lens]
+	idx_maps = {}   # word-to-index dicts, built on first use
+	base_pows = {}  # cached powers of base, keyed by (base,exponent)
+	chunk_len = 16  # digits converted directly, without splitting
+
+	@classmethod
+	def digit_idx(cls,wl_id):
+		"return a dict mapping each word of wordlist 'wl_id' to its index"
+		if wl_id not in cls.idx_maps:
+			cls.idx_maps[wl_id] = dict((w,i) for i,w in enumerate(cls.digits[wl_id]))
+		return cls.idx_maps[wl_id]
+
+	@classmethod
+	def base_pow(cls,base,n):
+		k = (base,n)
+		if k not in cls.base_pows:
+			cls.base_pows[k] = base ** n
+		return cls.base_pows[k]
+
+	# Divide-and-conquer radix conversion: long digit strings are split in half
+	# recursively, so big-integer arithmetic is done on a few large operands
+	# rather than on one operand per digit.
+	@classmethod
+	def digits2num(cls,digits,base):
+		"convert a list of digit values, most significant first, to an integer"
+		n = len(digits)
+		if n <= cls.chunk_len:
+			num = 0
+			for d in digits: num = num * base + d
+			return num
+		m = n / 2
+		return cls.digits2num(digits[:n-m],base) * cls.base_pow(base,m) + cls.digits2num(digits[n-m:],base)
+
+	@classmethod
+	def num2digits(cls,num,base,ndigits):
+		"convert 'num' (which must be less than base**ndigits) to exactly 'ndigits' digit values"
+		if ndigits <= cls.chunk_len:
+			ret = [0] * ndigits
+			for i in range(ndigits-1,-1,-1):
+				num,ret[i] = divmod(num,base)
+			return ret
+		m = ndigits / 2
+		hi,lo = divmod(num,cls.base_pow(base,m))
+		return cls.num2digits(hi,base,ndigits-m) + cls.num2digits(lo,base,m)
 
 	@classmethod
 	def b58encode(cls,s,pad=None):
@@ -315,14 +380,19 @@ class baseconv(object):
 
 		words = words_arg if type(words_arg) in (list,tuple) else tuple(words_arg.strip())
 
-		wl = cls.digits[wl_id]
+		wl = cls.digit_idx(wl_id)
 		base = len(wl)
 
-		if not set(words) <= set(wl):
+		try: digits = [wl[w] for w in words]
+		except KeyError:
 			die(2,'{} is not in {} (base{}) format'.format(repr(words_arg),wl_id,base))
 
-		deconv =  [wl.index(words[::-1][i])*(base**i) for i in range(len(words))]
-		ret = ('{:0{w}x}'.format(sum(deconv),w=pad or 0))
+		if wl_id == 'b58':
+			from mmgen.protocol import _b58tonum
+			num = _b58tonum(''.join(words))
+		else:
+			num = cls.digits2num(digits,base)
+		ret = ('{:0{w}x}'.format(num,w=pad or 0))
 		return ('','0')[len(ret) % 2] + ret
 
 	@classmethod
@@ -332,23 +402,28 @@ class baseconv(object):
 		if not is_hex_str(hexnum):
 			die(2,"'%s': not a hexadecimal number" % hexnum)
 
+		if wl_id == 'b58':
+			from mmgen.protocol import _b58encode_bin
+			ret = _b58encode_bin(unhexlify(('','0')[len(hexnum) % 2] + hexnum))
+			ret = '1' * ((pad or 0)-len(ret)) + ret
+			return ret if tostr else list(ret)
+
 		wl = cls.digits[wl_id]
 		base = len(wl)
-		num,ret = int(hexnum,16),[]
-		while num:
-			ret.append(num % base)
-			num /= base
-		o = [wl[n] for n in [0] * ((pad or 0)-len(ret)) + ret[::-1]]
+		from math import log
+		num = int(hexnum,16)
+		# upper bound on the number of digits, as the float estimate may be slightly off
+		ret = cls.num2digits(num,base,int(num.bit_length() / log(base,2)) + 2)
+		ret = ret[next((i for i,n in enumerate(ret) if n),len(ret)):] # strip leading zeros
+		o = [wl[n] for n in [0] * ((pad or 0)-len(ret)) + ret]
 		return ''.join(o) if tostr else o
 
-baseconv.check_wordlists()
-
 def match_ext(addr,ext):
 	return addr.split('.')[-1] == ext
 
 def file_exists(f):
 	try:
-		os.stat(f)
+		os.stat(f.encode('utf8') if type(f) == unicode else f)
 		return True
 	except:
 		return False
@@ -429,8 +504,8 @@ def compare_or_die(val1, desc1, val2, desc2, e='Error'):
 	return True
 
 def open_file_or_exit(filename,mode,silent=False):
-	try:
-		f = open(filename, mode)
+	try: # encode explicitly, as non-ASCII unicode filenames fail in the C locale
+		f = open(filename.encode('utf8') if type(filename) == unicode else filename, mode)
 	except:
 		op = ('writing','reading')['r' in mode]
 		die(2,("Unable to open file '{}' for {}".format(filename,op),'')[silent])
@@ -549,6 +624,16 @@ def write_data_to_file(
 	if not binary and type(data) == unicode:
 		data = data.encode('utf8')
 
+	# 'data' may also be an iterable of strings, to be written as produced.  Only
+	# errors from the write itself are caught: exceptions raised while producing
+	# the data propagate.
+	def write_data(f,dest):
+		for d in ([data] if isinstance(data,basestring) else data):
+			try:
+				f.write(d.encode('utf8') if not binary and type(d) == unicode else d)
+			except (IOError,OSError) as e:
+				die(2,'Failed to write %s to %s: %s' % (desc,dest,e.strerror))
+
 	def do_stdout():
 		qmsg('Output to STDOUT requested')
 		if sys.stdout.isatty():
@@ -576,7 +661,7 @@ def write_data_to_file(
 			import msvcrt
 			msvcrt.setmode(sys.stdout.fileno(),os.O_BINARY)
 
-		sys.stdout.write(data)
+		write_data(sys.stdout,'stdout')
 
 	def do_file(outfile,ask_write_prompt):
 		if opt.outdir and not os.path.isabs(outfile):
@@ -597,10 +682,15 @@ def write_data_to_file(
 
 		f = open_file_or_exit(outfile,('w','wb')[bool(binary)])
 		try:
-			f.write(data)
-		except:
-			die(2,"Failed to write %s to file '%s'" % (desc,outfile))
-		f.close
+			write_data(f,"file '%s'" % outfile)
+			try: f.close()
+			except (IOError,OSError) as e:
+				die(2,"Failed to write %s to file '%s': %s" % (desc,outfile,e.strerror))
+		except: # don't leave a truncated file behind, whatever the cause
+			try: f.close()
+			except: pass
+			if os.path.isfile(f.name): os.unlink(f.name)
+			raise
 
 		if not (hush or silent):
 			msg("%s written to file '%s'" % (capfirst(desc),outfile))
@@ -655,6 +745,40 @@ def get_lines_from_file(fn,desc='',trim_comments=False,silent=False):
 	dmsg(u"Got {} lines from file '{}'".format(len(ret),fn))
 	return ret
 
+# Return an iterator over the lines of a (possibly large) file, reading it
+# incrementally.  Encrypted files must be decrypted as a whole, so they're
+# handled by get_lines_from_file().
+def get_lines_from_file_iter(fn,desc='',trim_comments=False,silent=False):
+	if get_extension(fn) != g.mmenc_ext:
+		f = open_file_or_exit(fn,'rb',silent=silent)
+		head = f.read(4096)
+		f.close()
+		import codecs
+		try: codecs.getincrementaldecoder('utf8')().decode(head) # allows a partial char at end
+		except UnicodeDecodeError: pass # probably encrypted
+		else:
+			if not opt.quiet and not silent and desc:
+				qmsg("Getting %s from file '%s'" % (desc,fn))
+			def gen_lines():
+				n = lnum = 0
+				f = open_file_or_exit(fn,'rb',silent=silent)
+				try:
+					for line in codecs.getreader('utf8')(f):
+						lnum += 1
+						line = line.splitlines()[0] # DOS-safe
+						if trim_comments:
+							line = strip_comments(line)
+							if line == '': continue
+						n += 1
+						yield line
+				except UnicodeDecodeError:
+					die(2,u"'{}': invalid UTF-8 data after line {}".format(fn,lnum))
+				finally:
+					f.close()
+				dmsg(u"Got {} lines from file '{}'".format(n,fn))
+			return gen_lines()
+	return iter(get_lines_from_file(fn,desc,trim_comments=trim_comments,silent=silent))
+
 def get_data_from_user(desc='data',silent=False):
 	p = ('','Enter {}: '.format(desc))[g.stdin_tty]
 	data = my_raw_input(p,echo=opt.echo_passphrase)
@@ -670,6 +794,17 @@ def get_data_from_file(infile,desc='data',dash=False,silent=False,binary=False):
 	f.close()
 	return data
 
+def get_data_from_file_iter(infile,desc='data',silent=False,binary=False,chunk_size=1<<20):
+	"like get_data_from_file(), but yields the data in chunks of 'chunk_size' bytes"
+	if not opt.quiet and not silent and desc:
+		qmsg("Getting %s from file '%s'" % (desc,infile))
+	f = open_file_or_exit(infile,('r','rb')[bool(binary)],silent=silent)
+	while True:
+		d = f.read(chunk_size)
+		if not d: break
+		yield d
+	f.close()
+
 def pwfile_reuse_warning():
 	if 'passwd_file_used' in globals():
 		qmsg("Reusing passphrase from file '%s' at user request" % opt.passwd_file)
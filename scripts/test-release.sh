@@ -151,7 +151,8 @@ f_monero='Monero tests completed'
 i_misc_ni='Miscellaneous operations (non-interactive)'
 s_misc_ni='Testing miscellaneous operations (non-interactive)'
 t_misc_ni=(
-    'test/sha256test.py')
+    'test/sha256test.py'
+    'test/scrypttest.py')
 f_misc_ni='Miscellaneous non-interactive tests complete'
 
 i_misc='Miscellaneous operations (interactive)' # includes autosign!
@@ -87,6 +87,21 @@ module1 = Extension(
 	include_dirs = ['/usr/local/include',r'c:\msys\local\include'],
 	)
 
+module2 = Extension(
+	name         = 'mmgen.b58',
+	sources      = ['extmod/b58mod.c'],
+	)
+
+module3 = Extension(
+	name         = 'mmgen.sha256compress',
+	sources      = ['extmod/sha256mod.c'],
+	)
+
+module4 = Extension(
+	name         = 'mmgen.scryptromix',
+	sources      = ['extmod/scryptmod.c'],
+	)
+
 
 from mmgen.globalvars import g
 setup(
@@ -100,7 +115,7 @@ setup(
 		platforms    = 'Linux, MS Windows, Raspberry Pi/Raspbian, Orange Pi/Armbian',
 		keywords     = g.keywords,
 		cmdclass     = { 'build_ext': my_build_ext, 'install_data': my_install_data },
-		ext_modules  = [module1],
+		ext_modules  = [module1,module2,module3,module4],
 		data_files = [('share/mmgen', [
 				'data_files/mmgen.cfg',     # source files must have 0644 mode
 				'data_files/mn_wordlist.c',
@@ -109,6 +124,7 @@ setup(
 		py_modules = [
 			'mmgen.__init__',
 			'mmgen.addr',
+			'mmgen.agent',
 			'mmgen.altcoin',
 			'mmgen.protocol',
 			'mmgen.color',
@@ -124,6 +140,7 @@ setup(
 			'mmgen.opts',
 			'mmgen.regtest',
 			'mmgen.rpc',
+			'mmgen.secp256k1_native',
 			'mmgen.seed',
 			'mmgen.sha256',
 			'mmgen.term',
@@ -136,6 +153,7 @@ setup(
 			'mmgen.main',
 			'mmgen.main_wallet',
 			'mmgen.main_addrgen',
+			'mmgen.main_agent',
 			'mmgen.main_passgen',
 			'mmgen.main_addrimport',
 			'mmgen.main_regtest',
@@ -169,6 +187,7 @@ setup(
 			'cmds/mmgen-txsend',
 			'cmds/mmgen-txdo',
 			'cmds/mmgen-tool',
-			'cmds/mmgen-autosign'
+			'cmds/mmgen-autosign',
+			'cmds/mmgen-agent'
 		]
 	)
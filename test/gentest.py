@@ -50,12 +50,12 @@ opts_data = lambda: {
        Speed:   {prog} a [rounds]    (test speed of one key generator)
        Compare: {prog} a <dump file> (compare output of a key generator against wallet dump)
           where a and b are one of:
-             '1' - native Python ecdsa library (very slow)
+             '1' - native Python secp256k1 library
              '2' - bitcoincore.org's secp256k1 library (default from v0.8.6)
 
 EXAMPLES:
   {prog} 1:2 100
-    (compare output of native Python ECDSA with secp256k1 library, 100 rounds)
+    (compare output of native Python secp256k1 with secp256k1 library, 100 rounds)
   {prog} 2:ext 100
     (compare output of secp256k1 library with external library (see below), 100 rounds)
   {prog} 2 1000
@@ -188,10 +188,16 @@ def compare_test():
 				match_error(sec,sec.wif,sec.wif,b_wif,a,b)
 		else:
 			b_addr = ag.to_addr(kg_b.to_pubhex(sec))
-		vmsg('\nkey:  %s\naddr: %s\n' % (sec.wif,a_addr))
+		if opt.verbose: vmsg('\nkey:  %s\naddr: %s\n' % (sec.wif,a_addr))
 		if a_addr != b_addr:
 			match_error(sec,sec.wif,a_addr,b_addr,a,ext_lib if b == 'ext' else b)
 	qmsg_r('\rRound %s/%s ' % (i+1,rounds))
+	if b != 'ext': # batch mode
+		secs = [PrivKey(os.urandom(32),compressed=addr_type.compressed,pubkey_type=addr_type.pubkey_type)
+					for i in range(rounds)]
+		for sec,a_ph,b_ph in zip(secs,kg_a.to_pubhex_batch(secs),kg_b.to_pubhex_batch(secs)):
+			if a_ph != b_ph:
+				match_error(sec,sec.wif,a_ph,b_ph,a,b)
 	qmsg(green(('\n','')[bool(opt.verbose)] + 'OK'))
 
 def speed_test():
@@ -210,7 +216,7 @@ def speed_test():
 			last_t = time.time()
 		sec = PrivKey(seed+pack('I',i),compressed=addr_type.compressed,pubkey_type=addr_type.pubkey_type)
 		a_addr = ag.to_addr(kg_a.to_pubhex(sec))
-		vmsg('\nkey:  %s\naddr: %s\n' % (sec.wif,a_addr))
+		if opt.verbose: vmsg('\nkey:  %s\naddr: %s\n' % (sec.wif,a_addr))
 	qmsg_r('\rRound %s/%s ' % (i+1,rounds))
 	qmsg('\n{} addresses generated in {:.2f} seconds'.format(rounds,time.time()-start))
 
@@ -109,7 +109,9 @@ tests = OrderedDict([
 		'good': (
 			('3,2,2',[2,3]),
 			('101,1,3,5,2-7,99',[1,2,3,4,5,6,7,99,101]),
-			({'idx_list':AddrIdxList('1-5')},[1,2,3,4,5])
+			({'idx_list':AddrIdxList('1-5')},[1,2,3,4,5]),
+			{'idx_list':[9,3,4,5,3],'ret':[3,4,5,9]},
+			('7-9,1-3,4,2-5',[1,2,3,4,5,7,8,9])
 		)}),
 	('BTCAmt', {
 		'bad':  ('-3.2','0.123456789',123L,'123L','22000000',20999999.12345678),
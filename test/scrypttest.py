@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+# Check the output of the multithreaded scrypt against scrypt.hash().  The
+# threaded path is normally taken only on multi-CPU machines, so it's called
+# directly here.
+
+import sys,os,scrypt
+import mmgen.crypto
+from mmgen.crypto import scrypt_hash_mt
+
+def msg(s): sys.stderr.write(s)
+def green(s): return '\033[32;1m' + s + '\033[0m'
+
+def test_params():
+	params = ( # N,r,p,buflen,threads
+		(2**10,8,2,32,2),
+		(2**10,8,4,32,2),
+		(2**10,8,4,32,3),
+		(2**10,8,3,64,8),
+		(2**8,1,7,32,4),
+		(2**12,2,5,16,5),
+		(2**14,8,2,32,2)
+	)
+	pws = ('',u'фубар','x'*100)
+	n,total = 0,len(params) * len(pws)
+	for N,r,p,buflen,threads in params:
+		for pw in pws:
+			n += 1
+			msg('\rTesting parameter sets: {:4}/{} '.format(n,total))
+			salt = os.urandom(32)
+			ref = scrypt.hash(pw.encode('utf8'),salt,N,r,p,buflen=buflen)
+			ret = scrypt_hash_mt(pw,salt,N,r,p,buflen,threads)
+			assert ret == ref,'Hashes do not match! (N={} r={} p={} buflen={} threads={})'.format(
+								N,r,p,buflen,threads)
+	msg('OK\n')
+
+msg(green('Testing multithreaded scrypt\n'))
+if mmgen.crypto._scrypt_romix:
+	test_params()
+else:
+	msg('C ROMix function not built, skipping test\n')
@@ -40,7 +40,24 @@ def test_random(rounds):
 		compare_hashes(dlen,os.urandom(dlen))
 	msg('OK\n')
 
+def test_compress(rounds):
+	import mmgen.sha256
+	c_compress = mmgen.sha256._compress_c
+	if not c_compress:
+		msg('C compression function not built, skipping compression test\n')
+		return
+	for i in range(rounds):
+		if not (i+1) % 10:
+			msg('\rTesting C compression function: {:4}/{} '.format(i+1,rounds))
+		data = os.urandom(64 * (i % 4 + 1))
+		mmgen.sha256._compress_c = None
+		ref = Sha256(data,preprocess=False).hexdigest()
+		mmgen.sha256._compress_c = c_compress
+		assert Sha256(data,preprocess=False).hexdigest() == ref,'Compression results do not match!'
+	msg('OK\n')
+
 msg(green('Testing MMGen implementation of Sha256()\n'))
 test_K()
 test_ref()
 test_random(500)
+test_compress(500)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+#
+# mmgen = Multi-Mode GENerator, command-line Bitcoin cold storage solution
+# Copyright (C)2013-2017 Philemon <mmgen-py@yandex.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+test/startuptime.py: startup time benchmark for the MMGen suite commands
+"""
+
+import sys,os,time,subprocess
+repo_root = os.path.normpath(os.path.abspath(os.path.join(os.path.dirname(sys.argv[0]),os.pardir)))
+os.chdir(repo_root)
+sys.path.__setitem__(0,repo_root)
+os.environ['MMGEN_TEST_SUITE'] = '1'
+
+# Import this _after_ local path's been added to sys.path
+from mmgen.common import *
+
+opts_data = lambda: {
+	'desc': 'Measure the startup time of MMGen commands',
+	'usage':'[options] [command ...]',
+	'options': """
+-h, --help          Print this help message
+--, --longhelp      Print help message for long options (common options)
+-c, --compare       Also time each command with the mnemonic wordlists loaded
+                    at startup, as before they were loaded on first use, and
+                    report the saving
+-r, --repeat=     n Run each command 'n' times and report the fastest run (default: 10)
+-s, --system        Test scripts and modules installed on system rather than
+                    those in the repo root
+""",
+	'notes': """
+
+Each command is run with the '--version' option, so that it exits immediately
+after importing its modules and parsing the command line.  If no commands are
+specified, all commands in the 'cmds' directory are tested.  With --compare,
+the saving for each command is the eager time minus the lazy time.
+"""
+}
+
+cmd_args = opts.init(opts_data)
+
+repeat = int(opt.repeat or 10)
+cmds = cmd_args or sorted(os.listdir('cmds'))
+
+if opt.system: sys.path.pop(0)
+os.environ['PYTHONPATH'] = ('',repo_root)[not opt.system]
+
+# Run commands through a wrapper, so that timings with and without preloaded
+# wordlists differ only by the cost of loading them
+wrapper = """
+import sys
+mode,sys.argv = sys.argv[1],sys.argv[2:] # set argv first: the program name is read at import
+if mode == 'eager':
+	from mmgen.util import baseconv
+	baseconv.check_wordlists()
+execfile(sys.argv[0],{'__name__':'__main__','__file__':sys.argv[0]})
+"""
+
+def cmd_path(cmd):
+	if opt.system:
+		from distutils.spawn import find_executable
+		return find_executable(cmd) or die(2,"'{}': command not found".format(cmd))
+	return os.path.join('cmds',cmd)
+
+def time_cmd(cmd,modes):
+	"return the fastest run time of 'cmd' in each mode, alternating modes to even out system load"
+	best = [None] * len(modes)
+	for i in range(repeat):
+		for n,mode in enumerate(modes):
+			t = time.time()
+			p = subprocess.Popen(['python','-c',wrapper,mode,cmd_path(cmd),'--version'],
+									stdout=subprocess.PIPE,stderr=subprocess.PIPE)
+			p.communicate()
+			t = time.time() - t
+			if p.returncode: die(2,"'{}': command exited with error".format(cmd))
+			if best[n] == None or t < best[n]: best[n] = t
+	return best
+
+def fmt_times(t):
+	return ['{:.3f}s'.format(n) for n in t + ([t[1]-t[0]] if opt.compare else [])]
+
+modes = ('lazy','eager') if opt.compare else ('lazy',)
+fs = '{:20}' + ' {:>8}' * (len(modes) + bool(opt.compare))
+if opt.compare: Msg(fs.format('command','lazy','eager','saving'))
+totals = [0] * len(modes)
+for cmd in cmds:
+	t = time_cmd(cmd,modes)
+	totals = [a+b for a,b in zip(totals,t)]
+	Msg(fs.format(cmd,*fmt_times(t)))
+Msg(fs.format('total',*fmt_times(totals)))
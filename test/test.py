@@ -587,6 +587,7 @@ cmd_group['tool'] = OrderedDict([
 	['tool_decrypt',     (9,"'mmgen-tool decrypt' (random data)", [[[cfgs['9']['tool_enc_infn'],cfgs['9']['tool_enc_infn']+'.mmenc'],9]],1)],
 #	['tool_encrypt_ref', (9,"'mmgen-tool encrypt' (reference text)",  [])],
 	['tool_find_incog_data', (9,"'mmgen-tool find_incog_data'", [[[hincog_fn],1],[[incog_id_fn],1]])],
+	['tool_find_incog_data_multi', (9,"'mmgen-tool find_incog_data' (multiple IDs, jobs, resume)",[],1)],
 #	['pywallet', (9,"'mmgen-pywallet'", [],1)],
 ])
 
@@ -602,12 +603,16 @@ cmd_group['ref'] = (
 	# generating new reference ('abc' brainwallet) files:
 	('refwalletgen',   ([],'gen new refwallet')),
 	('refaddrgen',     (['mmdat',pwfile],'new refwallet addr chksum')),
+	('refaddrgen_mp',  (['mmdat',pwfile],'new refwallet addr chksum (multiprocess)')),
+	('refaddrgen_cp',  (['mmdat',pwfile],'new refwallet addr chksum (with chain checkpoints)')),
 	('refkeyaddrgen',  (['mmdat',pwfile],'new refwallet key-addr chksum')),
 	('refaddrgen_compressed',    (['mmdat',pwfile],'new refwallet addr chksum (compressed)')),
 	('refkeyaddrgen_compressed', (['mmdat',pwfile],'new refwallet key-addr chksum (compressed)')),
 	('refpasswdgen',   (['mmdat',pwfile],'new refwallet passwd file chksum')),
 	('ref_b32passwdgen',(['mmdat',pwfile],'new refwallet passwd file chksum (base32)')),
 	('ref_hexpasswdgen',(['mmdat',pwfile],'new refwallet passwd file chksum (base32)')),
+	('ref_batchpasswdgen',(['mmdat',pwfile],'new refwallet passwd file chksums (batch mode)')),
+	('ref_agentaddrgen',(['mmdat',pwfile],'new refwallet addr chksum (seed from agent)')),
 )
 
 # misc. saved reference data
@@ -1451,6 +1456,15 @@ class MMGenTestSuite(object):
 	def refaddrgen(self,name,wf,pf):
 		self.addrgen(name,wf,pf=pf,check_ref=True)
 
+	def refaddrgen_mp(self,name,wf,pf):
+		self.addrgen(name,wf,pf=pf,check_ref=True,extra_args=['--jobs=3'])
+
+	def refaddrgen_cp(self,name,wf,pf):
+		os.environ['MMGEN_ADDR_CHECKPOINT_INTERVAL'] = '100'
+		for i in (1,2): # create the checkpoints, then generate from them
+			self.addrgen(name,wf,pf=pf,check_ref=True)
+		del os.environ['MMGEN_ADDR_CHECKPOINT_INTERVAL']
+
 	def refaddrgen_compressed(self,name,wf,pf):
 		if opt.segwit:
 			msg('Skipping non-Segwit address generation'); return True
@@ -1752,6 +1766,49 @@ class MMGenTestSuite(object):
 		ea = ['--hex']
 		self.addrgen(name,wf,pf,check_ref=True,ftype='passhex',id_str='фубар@crypto.org',extra_args=ea)
 
+	def ref_batchpasswdgen(self,name,wf,pf):
+		bf = 'passwd_batch.txt'
+		write_to_tmpfile(cfg,bf,u'alice@crypto.org\nфубар@crypto.org b32 17 # comment\nфубар@crypto.org hex\n')
+		t = MMGenExpect(name,'mmgen-passgen',['-d',cfg['tmpdir'],usr_rand_arg,'--jobs=2','-B',os.path.join(cfg['tmpdir'],bf),
+											wf,cfg['pass_idx_list']])
+		t.license()
+		t.passphrase('MMGen wallet',cfg['wpasswd'])
+		t.expect('Passphrase is OK')
+		t.expect('Encrypt password lists? (y/N): ','y')
+		t.usr_rand(usr_rand_chars)
+		t.hash_preset('password lists','1')
+		t.passphrase_new('password lists',cfg['wpasswd'])
+		fns = []
+		for k in ('passfile_chk','passfile32_chk','passfilehex_chk'):
+			chk = t.expect_getend(r'Checksum for password data .*?: ',regex=True)
+			refcheck('password data checksum',chk,cfg[k])
+			fns.append(t.written_to_file('Encrypted password list',oo=True))
+		t.ok()
+		# the lists share a passphrase and key, so each must decrypt with it
+		for fn,k in zip(fns,('passfile_chk','passfile32_chk','passfilehex_chk')):
+			t = MMGenExpect(name,'mmgen-tool',['passwdfile_chksum',fn],extra_desc='(check {})'.format(k))
+			t.hash_preset('password data','1')
+			t.passphrase('password data',cfg['wpasswd'])
+			refcheck('password data checksum',t.read().strip().split('\n')[-1],cfg[k])
+
+	def ref_agentaddrgen(self,name,wf,pf):
+		t = MMGenExpect(name,'mmgen-agent',['start'])
+		os.environ['MMGEN_AGENT_SOCK'] = t.expect_getend('MMGEN_AGENT_SOCK=').split(';')[0]
+		try:
+			t = MMGenExpect(name,'mmgen-agent',['add',wf])
+			t.passphrase('MMGen wallet',cfg['wpasswd'])
+			t.expect('Added Seed ID ')
+			mmtype = ('','segwit')[bool(cfg['segwit'])]
+			t = MMGenExpect(name,'mmgen-addrgen',['-d',cfg['tmpdir']] +
+					([],['--type='+mmtype])[bool(mmtype)] + [wf,cfg['addr_idx_list']])
+			t.license()
+			t.expect('retrieved from seed agent')
+			chk = t.expect_getend(r'Checksum for address data .*?: ',regex=True)
+		finally:
+			MMGenExpect(name,'mmgen-agent',['stop']).expect('Seed agent stopped')
+			del os.environ['MMGEN_AGENT_SOCK']
+		refcheck('address data checksum',chk,cfg['addrfile{}_chk'.format('_'+mmtype if mmtype else '')][fork][g.testnet])
+
 	def txsign_keyaddr(self,name,keyaddr_file,txfile):
 		t = MMGenExpect(name,'mmgen-txsign', ['-d',cfg['tmpdir'],'-M',keyaddr_file,txfile])
 		t.license()
@@ -1895,6 +1952,47 @@ class MMGenTestSuite(object):
 		os.unlink(f1)
 		cmp_or_die(hincog_offset,int(o))
 
+	def tool_find_incog_data_multi(self,name):
+		from hashlib import sha256
+		import json
+		# IVs at the start of the file, across the boundary between the first two
+		# 4 MB scan segments and at the end of the file
+		seg_len,ivsize = 1<<22,g.aesctr_iv_len
+		size = 2*seg_len + 54321
+		offsets = [0,seg_len-7,size-ivsize]
+		d = bytearray(os.urandom(size))
+		ivs = [os.urandom(ivsize) for o in offsets]
+		for o,iv in zip(offsets,ivs): d[o:o+ivsize] = iv
+		fn = get_tmpfile_fn(cfg,'incog_search_data')
+		write_to_tmpfile(cfg,'incog_search_data',str(d),binary=True)
+		ids = [sha256(iv).hexdigest()[:8].upper() for iv in ivs]
+		id_arg = ','.join(ids[::-1])
+
+		def run(extra_args,extra_desc,state_fn=None):
+			t = MMGenExpect(name,'mmgen-tool',['find_incog_data',fn,id_arg]+extra_args,extra_desc=extra_desc)
+			o = t.read()
+			found = set((i,int(n)) for i,n in re.findall(r'Incog data for ID (\w+) found at offset (\d+)',o))
+			# random data matches an ID prefix with small probability, so allow extra finds
+			if not set(zip(ids,offsets)) <= found:
+				die(2,'Expected IDs/offsets {}, got {}'.format(sorted(zip(ids,offsets)),sorted(found)))
+			if state_fn and ('Resuming scan' not in o or os.path.exists(state_fn)):
+				die(2,'Saved scan state was not used')
+			t.ok()
+
+		run(['jobs=2'],'(2 jobs)')
+
+		# saved state of an interrupted scan: the first 1 MB of the first job's shard
+		# has been searched, and the first ID found
+		nstarts = size - ivsize + 1
+		n = (nstarts + 1) / 2
+		state_fn = os.path.join(data_dir,'find_incog-{}.json'.format(
+						sha256(json.dumps([os.path.abspath(fn),size,sorted(ids)])).hexdigest()[:8]))
+		with open(state_fn,'wb') as f:
+			json.dump({ 'file':os.path.abspath(fn),'size':size,'ids':sorted(ids),
+						'shards':[[1<<20,n],[n,nstarts]],'found':[[ids[0],0]] },f)
+		run(['resume=1'],'(resume)',state_fn)
+		os.unlink(fn)
+
 	# Miscellaneous tests
 	def autosign(self,name): # tests everything except device detection, mount/unmount
 		if g.platform == 'win':
@@ -2730,12 +2828,16 @@ class MMGenTestSuite(object):
 			'ref_brain_chk',
 			'ref_hincog_chk',
 			'refaddrgen',
+			'refaddrgen_mp',
+			'refaddrgen_cp',
 			'refkeyaddrgen',
 			'refaddrgen_compressed',
 			'refkeyaddrgen_compressed',
 			'refpasswdgen',
 			'ref_b32passwdgen',
-			'ref_hexpasswdgen'
+			'ref_hexpasswdgen',
+			'ref_batchpasswdgen',
+			'ref_agentaddrgen'
 		):
 		for i in ('1','2','3'):
 			locals()[k+i] = locals()[k]
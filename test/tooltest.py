@@ -75,6 +75,7 @@ cmd_data = OrderedDict([
 				('Hexdump',      ()),
 				('Unhexdump',    ('Hexdump','io')),
 				('Rand2file',    ()),
+				('Hash_preset_bench',()),
 			])
 		}
 	),
@@ -341,6 +342,10 @@ class MMGenToolTestSuite(object):
 		d = read_from_tmpfile(cfg,of,binary=True)
 		cmp_or_die(dlen,len(d))
 
+	def Hash_preset_bench(self,name):
+		ret = self.run_cmd(name,['target_secs=600','max_secs=0.1','save=0'])
+		ok_or_die(ret,lambda s: "hash preset for a 600.0s unlock time: '" in s,'hash preset recommendation')
+
 	# Cryptocoin
 	def Randwif(self,name):
 		for n,k in enumerate(['',maybe_compressed]):